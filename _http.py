@@ -0,0 +1,45 @@
+"""
+Shared HTTP session for the API test scripts
+Test modules imported into one process (e.g. by pytest) reuse a single
+connection pool to the API instead of each opening their own.
+"""
+
+import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = "http://localhost:8000"
+URL_HEALTH = f"{BASE_URL}/health"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# (connect, read) timeouts, so a hung API fails the call instead of the run.
+# Endpoints that wait on the LLM get a read budget covering its own timeout
+TIMEOUT = (2, 10)
+LLM_TIMEOUT = (2, 180)
+
+# Connection failures and gateway errors are retried briefly; POSTs are
+# only retried when the request never reached the server
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504]),
+))
+
+# Latest healthy /health response, shared by every module's health check
+# and re-probed once it is HEALTH_TTL seconds old
+HEALTH_TTL = 30
+_health_cache = TTLCache(maxsize=1, ttl=HEALTH_TTL)
+
+def get_health() -> requests.Response:
+    """GET /health, reusing a recent 200 response"""
+    response = _health_cache.get("health")
+    if response is not None:
+        return response
+    response = SESSION.get(URL_HEALTH, timeout=TIMEOUT)
+    # Unhealthy answers aren't kept, so a server that was still starting is asked again
+    if response.status_code == 200:
+        _health_cache["health"] = response
+    return response
+
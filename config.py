@@ -3,111 +3,67 @@ Configuration module for YouTube Channel Strategy Analyzer
 Handles environment variable loading and provides configuration settings
 """
 
+import json
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv
 
+# Environment variables read by Settings, with their defaults
+_DEFAULTS = {
+    "DATABASE_TYPE": "sqlite",
+    "DATABASE_PATH": "sqlite",
+    "DATABASE_FILE": "yt_insights.db",
+    "DATABASE_URL": "",
+    "OLLAMA_BASE_URL": "http://localhost:11434",
+    "OLLAMA_MODEL": "qwen2.5:7b",
+    "OLLAMA_NUM_PARALLEL": "4",
+    "API_HOST": "0.0.0.0",
+    "API_PORT": "8000",
+    "API_WORKERS": "1",
+    "API_LOG_LEVEL": "info",
+    "NORMALIZE_PATHS": "true",
+    "ENVIRONMENT": "development",
+    "DEBUG": "false",
+}
+
+_TRUTHY = ("true", "1", "yes", "on")
+
+@dataclass(frozen=True, slots=True)
 class Settings:
     """Application settings loaded from environment variables"""
     
-    def __init__(self):
-        # Load environment variables from config.env file
-        env_file = Path("config.env")
-        if env_file.exists():
-            load_dotenv(env_file)
-        else:
-            # Fallback to .env file if config.env doesn't exist
-            load_dotenv()
-    
     # Database Configuration
-    @property
-    def database_type(self) -> str:
-        return os.getenv("DATABASE_TYPE", "sqlite")
-    
-    @property
-    def database_path(self) -> Path:
-        path_str = os.getenv("DATABASE_PATH", "sqlite")
-        return Path(path_str)
-    
-    @property
-    def database_file(self) -> str:
-        return os.getenv("DATABASE_FILE", "yt_insights.db")
-    
-    @property
-    def database_url(self) -> str:
-        """Get the full database URL"""
-        custom_url = os.getenv("DATABASE_URL")
-        if custom_url:
-            return custom_url
-        
-        # Construct URL from components
-        db_path = self.database_path / self.database_file
-        return f"sqlite:///{db_path}"
-    
-    @property
-    def database_full_path(self) -> Path:
-        """Get the full path to the database file (only for local databases)"""
-        if self.is_cloud_database:
-            # For cloud databases, return a placeholder path
-            return Path("cloud_database")
-        return self.database_path / self.database_file
-    
-    @property
-    def is_cloud_database(self) -> bool:
-        """Check if we're using a cloud database"""
-        db_url = os.getenv("DATABASE_URL", "")
-        return db_url.startswith("sqlitecloud://")
-    
-    @property
-    def cloud_connection_string(self) -> Optional[str]:
-        """Get the cloud database connection string"""
-        if self.is_cloud_database:
-            return os.getenv("DATABASE_URL")
-        return None
+    database_type: str
+    database_path: Path
+    database_file: str
+    database_url: str
+    database_full_path_str: str
+    is_cloud_database: bool
+    cloud_connection_string: Optional[str]
     
     # Ollama Configuration
-    @property
-    def ollama_base_url(self) -> str:
-        return os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    
-    @property
-    def ollama_model(self) -> str:
-        return os.getenv("OLLAMA_MODEL", "qwen2.5:7b")
+    ollama_base_url: str
+    ollama_model: str
+    ollama_num_parallel: int
     
     # API Configuration
-    @property
-    def api_host(self) -> str:
-        return os.getenv("API_HOST", "0.0.0.0")
-    
-    @property
-    def api_port(self) -> int:
-        return int(os.getenv("API_PORT", "8000"))
-    
-    @property
-    def api_workers(self) -> int:
-        return int(os.getenv("API_WORKERS", "1"))
-    
-    @property
-    def api_log_level(self) -> str:
-        return os.getenv("API_LOG_LEVEL", "info")
+    api_host: str
+    api_port: int
+    api_workers: int
+    api_log_level: str
+    normalize_paths: bool
     
     # Environment Configuration
-    @property
-    def environment(self) -> str:
-        return os.getenv("ENVIRONMENT", "development")
+    environment: str
+    debug: bool
     
-    @property
-    def debug(self) -> bool:
-        return os.getenv("DEBUG", "false").lower() in ("true", "1", "yes", "on")
-    
-    def ensure_database_directory(self):
-        """Ensure the database directory exists (only for local databases)"""
-        if not self.is_cloud_database:
-            self.database_path.mkdir(parents=True, exist_ok=True)
+    _summary: dict = field(init=False, repr=False, compare=False)
+    _database_full_path: Path = field(init=False, repr=False, compare=False)
     
-    def get_config_summary(self) -> dict:
-        """Get a summary of current configuration (without sensitive data)"""
+    def __post_init__(self):
+        # Configuration summary, built once since settings don't change after load
         summary = {
             "database_type": self.database_type,
             "database_path": str(self.database_path),
@@ -130,7 +86,111 @@ class Settings:
             else:
                 summary["database_cloud_url"] = cloud_url
         
-        return summary
+        object.__setattr__(self, "_summary", summary)
+        object.__setattr__(self, "_database_full_path", Path(self.database_full_path_str))
+    
+    @property
+    def database_full_path(self) -> Path:
+        """Get the full path to the database file (only for local databases)"""
+        # For cloud databases this is a placeholder path
+        return self._database_full_path
+    
+    def ensure_database_directory(self):
+        """Ensure the database directory exists (only for local databases)"""
+        if not self.is_cloud_database:
+            self.database_path.mkdir(parents=True, exist_ok=True)
+    
+    def get_config_summary(self) -> dict:
+        """Get a summary of current configuration (without sensitive data)"""
+        return dict(self._summary)
+
+def _load_env_file(env_file: Path):
+    """Apply an env file to os.environ, reusing a parsed sidecar while the file is unchanged"""
+    stat = env_file.stat()
+    key = [stat.st_mtime_ns, stat.st_size]
+    cache_file = env_file.with_name(f".{env_file.name}.cache.json")
+    
+    values = None
+    try:
+        cached = json.loads(cache_file.read_text())
+        if cached["key"] == key:
+            values = cached["values"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    
+    if values is None:
+        values = dotenv_values(env_file)
+        try:
+            # The sidecar holds every value, credentials included, so it is
+            # recreated readable by the owner only (and is gitignored)
+            cache_file.unlink(missing_ok=True)
+            fd = os.open(cache_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps({"key": key, "values": values}))
+        except OSError:
+            pass
+    
+    # Same semantics as load_dotenv(): existing variables win
+    for name, value in values.items():
+        if value is not None:
+            os.environ.setdefault(name, value)
+
+def load_settings() -> Settings:
+    """Load config.env (or .env) and build the Settings snapshot"""
+    # Load environment variables from config.env file
+    env_file = Path("config.env")
+    if not env_file.exists():
+        # Fallback to .env file if config.env doesn't exist
+        found = find_dotenv()
+        env_file = Path(found) if found else None
+    if env_file is not None:
+        _load_env_file(env_file)
+    
+    # Snapshot the environment once; it doesn't change after load
+    env = {key: os.environ.get(key, default) for key, default in _DEFAULTS.items()}
+    
+    custom_url = env["DATABASE_URL"]
+    is_cloud = custom_url.startswith("sqlitecloud://")
+    if is_cloud:
+        full_path_str = "cloud_database"
+    else:
+        full_path_str = os.path.join(env["DATABASE_PATH"], env["DATABASE_FILE"])
+    
+    database_path = Path(env["DATABASE_PATH"])
+    if custom_url:
+        database_url = custom_url
+    else:
+        # Construct URL from components
+        database_url = f"sqlite:///{database_path / env['DATABASE_FILE']}"
+    
+    return Settings(
+        database_type=env["DATABASE_TYPE"],
+        database_path=database_path,
+        database_file=env["DATABASE_FILE"],
+        database_url=database_url,
+        database_full_path_str=full_path_str,
+        is_cloud_database=is_cloud,
+        cloud_connection_string=custom_url if is_cloud else None,
+        ollama_base_url=env["OLLAMA_BASE_URL"],
+        ollama_model=env["OLLAMA_MODEL"],
+        ollama_num_parallel=int(env["OLLAMA_NUM_PARALLEL"]),
+        api_host=env["API_HOST"],
+        api_port=int(env["API_PORT"]),
+        api_workers=int(env["API_WORKERS"]),
+        api_log_level=env["API_LOG_LEVEL"],
+        normalize_paths=env["NORMALIZE_PATHS"].lower() in _TRUTHY,
+        environment=env["ENVIRONMENT"],
+        debug=env["DEBUG"].lower() in _TRUTHY,
+    )
+
+# Global settings instance, built on first access (PEP 562) so that
+# importing this module doesn't read config.env
+_settings: Optional[Settings] = None
 
-# Global settings instance
-settings = Settings()
+def __getattr__(name: str):
+    if name == "settings":
+        global _settings
+        if _settings is None:
+            _settings = load_settings()
+        return _settings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
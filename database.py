@@ -1,15 +1,15 @@
-import sqlite3
-import json
-import os
+import orjson
 import asyncio
-from typing import Optional, Dict, Any
-from pathlib import Path
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Union
 import aiosqlite
-from sqlalchemy import create_engine, Column, String, Text, UniqueConstraint
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from cachetools import TTLCache
 from config import settings
 
+logger = logging.getLogger(__name__)
+
 # Import sqlitecloud for cloud database support
 try:
     import sqlitecloud
@@ -18,38 +18,52 @@ except ImportError:
     SQLITECLOUD_AVAILABLE = False
     print("⚠️  SQLite Cloud not available. Install with: pip install sqlitecloud")
 
+# Import zstandard for compressed JSON storage
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    print("⚠️  zstandard not available, storing JSON uncompressed. Install with: pip install zstandard")
+
+# Every zstd frame starts with this magic number; anything else is plain JSON
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
 # Ensure database directory exists (only for local databases)
 settings.ensure_database_directory()
 
-# SQLAlchemy setup using configuration
-if settings.is_cloud_database:
-    # For cloud databases, we'll handle connections differently
-    # SQLAlchemy may not work directly with SQLite Cloud
-    print("🌩️  Using SQLite Cloud database")
-    engine = None
-    SessionLocal = None
-    Base = declarative_base()
-else:
-    # Traditional local SQLite setup
-    print("🗂️  Using local SQLite database")
-    engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    Base = declarative_base()
+# SQL statements are module-level constants so every call passes the same
+# string and hits sqlite3's per-connection prepared statement cache
+_SELECT_ONE_SQL = "SELECT json_response FROM channel_engagement WHERE channel_id = ? AND engagement_type = ?"
+_SELECT_ALL_SQL = "SELECT engagement_type, json_response FROM channel_engagement WHERE channel_id = ?"
+# ON CONFLICT updates the existing row in place, where INSERT OR REPLACE
+# would delete and re-insert it
+_UPSERT_SQL = """INSERT INTO channel_engagement 
+                (channel_id, engagement_type, json_response) 
+                VALUES (?, ?, ?)
+                ON CONFLICT(channel_id, engagement_type)
+                DO UPDATE SET json_response = excluded.json_response"""
+_UPSERT_RETURNING_SQL = _UPSERT_SQL + " RETURNING channel_id"
+# The composite primary key enforces uniqueness; WITHOUT ROWID stores rows
+# directly in the PK b-tree instead of a separate rowid table
+_CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS channel_engagement (
+        channel_id TEXT NOT NULL,
+        engagement_type TEXT NOT NULL,
+        json_response BLOB,
+        PRIMARY KEY (channel_id, engagement_type)
+    ) WITHOUT ROWID
+"""
 
-class ChannelEngagement(Base):
-    __tablename__ = "channel_engagement"
+class _LazyKeys:
+    """Log argument that only lists a payload's keys when the record is emitted"""
+    __slots__ = ("data",)
     
-    channel_id = Column(String, primary_key=True)
-    engagement_type = Column(String, primary_key=True)
-    json_response = Column(Text)
+    def __init__(self, data):
+        self.data = data
     
-    __table_args__ = (
-        UniqueConstraint('channel_id', 'engagement_type', name='_channel_engagement_uc'),
-    )
-
-# Create tables (only for local databases)
-if engine is not None:
-    Base.metadata.create_all(bind=engine)
+    def __str__(self):
+        return str(list(self.data.keys())) if isinstance(self.data, dict) else "Not a dict"
 
 class DatabaseManager:
     """Database manager for channel engagement operations"""
@@ -62,15 +76,169 @@ class DatabaseManager:
             if not SQLITECLOUD_AVAILABLE:
                 raise ImportError("sqlitecloud package is required for cloud database. Install with: pip install sqlitecloud")
         else:
-            self.db_path = str(settings.database_full_path)
+            self.db_path = settings.database_full_path_str
             print(f"🗂️  DatabaseManager: Using local SQLite at {self.db_path}")
-    
-    def _get_sync_connection(self):
-        """Get a synchronous connection (for cloud database)"""
+        
+        # Shared local connection, opened on first use
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+        
+        # The schema is created once per process; later calls are no-ops
+        self._tables_ready = False
+        self._schema_lock = asyncio.Lock()
+        
+        # Read-through cache of stored row values keyed by (channel_id, engagement_type),
+        # decoded on every hit so callers never share a dict. Writes invalidate
+        # their keys only in this process, so with several API workers a row
+        # saved by another worker could be served stale; the cache is then off
+        self._read_cache: Optional[TTLCache] = (
+            TTLCache(maxsize=4096, ttl=60) if settings.api_workers == 1 else None
+        )
+        # Per-key write counters: a read only fills the cache if no save of its
+        # key ran meanwhile, so a row fetched before a save isn't cached after it
+        self._write_generations: Dict[tuple, int] = {}
+        
+        # Cloud calls are blocking, so they run on their own pool rather than
+        # the loop's default executor, each worker keeping one open connection
+        self._tls = threading.local()
+        self._sync_conns: list = []
+        self._cloud_pool: Optional[ThreadPoolExecutor] = None
+        if self.is_cloud:
+            self._cloud_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="sqlitecloud")
+        
+        # Reused zstd contexts, built once instead of per call
+        if ZSTD_AVAILABLE:
+            self._compressor = zstd.ZstdCompressor(level=3)
+            self._decompressor = zstd.ZstdDecompressor()
+        else:
+            self._compressor = None
+            self._decompressor = None
+        
+        # is_cloud never changes after init, so pick the backend primitives
+        # once instead of branching on every query
         if self.is_cloud:
-            return sqlitecloud.connect(self.connection_string)
+            self._fetchone = self._execute_query_cloud
+            self._fetchall = self._execute_fetchall_cloud
+            self._execute = self._execute_command_cloud
+            self._execute_returning = self._execute_returning_cloud
+            self._executemany = self._execute_many_cloud
         else:
-            return sqlite3.connect(self.db_path)
+            self._fetchone = self._execute_query_local
+            self._fetchall = self._execute_fetchall_local
+            self._execute = self._execute_command_local
+            self._execute_returning = self._execute_returning_local
+            self._executemany = self._execute_many_local
+    
+    def _encode(self, data: Union[Dict[str, Any], bytes]) -> bytes:
+        """Serialize data to JSON bytes, zstd-compressed when available"""
+        # Callers holding a pydantic model pass its JSON bytes directly
+        payload = data if isinstance(data, bytes) else orjson.dumps(data)
+        if self._compressor is not None:
+            return self._compressor.compress(payload)
+        return payload
+    
+    def _decode(self, value) -> Optional[Dict[str, Any]]:
+        """Deserialize a stored value, accepting compressed BLOBs and legacy TEXT rows"""
+        if not value:
+            return None
+        if isinstance(value, bytes) and value[:4] == _ZSTD_MAGIC:
+            if self._decompressor is None:
+                raise RuntimeError("zstandard package is required to read compressed rows. Install with: pip install zstandard")
+            value = self._decompressor.decompress(value)
+        return orjson.loads(value)
+    
+    async def _get_conn(self) -> aiosqlite.Connection:
+        """Get the shared local aiosqlite connection, opening it on first use"""
+        if self._conn is None:
+            async with self._lock:
+                if self._conn is None:
+                    conn = await aiosqlite.connect(self.db_path)
+                    # page_size only takes effect on a new database and must be
+                    # set before switching to WAL
+                    await conn.execute("PRAGMA page_size=8192")
+                    await conn.execute("PRAGMA journal_mode=WAL")
+                    await conn.execute("PRAGMA synchronous=NORMAL")
+                    await conn.execute("PRAGMA mmap_size=268435456")
+                    await conn.execute("PRAGMA cache_size=-65536")
+                    await conn.execute("PRAGMA temp_store=MEMORY")
+                    self._conn = conn
+        return self._conn
+    
+    async def close(self):
+        """Close the shared local connection, the cloud worker pool and its connections"""
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+        if self._cloud_pool is not None:
+            # Let in-flight cloud calls finish without blocking the event loop
+            await asyncio.to_thread(self._cloud_pool.shutdown)
+            self._cloud_pool = None
+        while self._sync_conns:
+            try:
+                self._sync_conns.pop().close()
+            except Exception as e:
+                logger.debug("Ignoring error closing cloud connection: %s", e)
+    
+    async def _execute_query_local(self, query: str, params: tuple = ()) -> Optional[Any]:
+        """Execute a query on the shared local connection and fetch one row"""
+        db = await self._get_conn()
+        async with db.execute(query, params) as cursor:
+            return await cursor.fetchone()
+    
+    async def _execute_fetchall_local(self, query: str, params: tuple = ()) -> list:
+        """Execute a query on the shared local connection and fetch all rows"""
+        db = await self._get_conn()
+        async with db.execute(query, params) as cursor:
+            return await cursor.fetchall()
+    
+    async def _execute_command_local(self, command: str, params: tuple = ()) -> bool:
+        """Execute and commit a command on the shared local connection"""
+        db = await self._get_conn()
+        async with self._lock:
+            await db.execute(command, params)
+            await db.commit()
+        return True
+    
+    async def _execute_returning_local(self, command: str, params: tuple = ()) -> Optional[Any]:
+        """Execute and commit a RETURNING command on the shared local connection"""
+        db = await self._get_conn()
+        async with self._lock:
+            async with db.execute(command, params) as cursor:
+                row = await cursor.fetchone()
+            await db.commit()
+        return row
+    
+    async def _execute_many_local(self, command: str, seq_of_params: list) -> bool:
+        """Execute a command for every parameter tuple in one local transaction"""
+        db = await self._get_conn()
+        async with self._lock:
+            await db.executemany(command, seq_of_params)
+            await db.commit()
+        return True
+    
+    def _get_sync_connection(self):
+        """Get the calling worker thread's synchronous cloud database connection"""
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = sqlitecloud.connect(self.connection_string)
+            self._tls.conn = conn
+            self._sync_conns.append(conn)
+        return conn
+    
+    def _drop_sync_connection(self):
+        """Discard the calling thread's connection after an error so the next call reconnects"""
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            return
+        self._tls.conn = None
+        try:
+            self._sync_conns.remove(conn)
+        except ValueError:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
     
     async def _execute_query_cloud(self, query: str, params: tuple = ()) -> Optional[Any]:
         """Execute a query on cloud database asynchronously"""
@@ -81,13 +249,13 @@ class DatabaseManager:
                 conn = self._get_sync_connection()
                 cursor = conn.execute(query, params)
                 result = cursor.fetchone()
-                conn.close()
                 return result
             except Exception as e:
-                print(f"Cloud database query error: {e}")
+                self._drop_sync_connection()
+                logger.error("Cloud database query error: %s", e)
                 return None
         
-        return await loop.run_in_executor(None, run_query)
+        return await loop.run_in_executor(self._cloud_pool, run_query)
     
     async def _execute_command_cloud(self, command: str, params: tuple = ()) -> bool:
         """Execute a command (INSERT/UPDATE/DELETE) on cloud database asynchronously"""
@@ -98,13 +266,13 @@ class DatabaseManager:
                 conn = self._get_sync_connection()
                 conn.execute(command, params)
                 conn.commit()
-                conn.close()
                 return True
             except Exception as e:
-                print(f"Cloud database command error: {e}")
+                self._drop_sync_connection()
+                logger.error("Cloud database command error: %s", e)
                 return False
         
-        return await loop.run_in_executor(None, run_command)
+        return await loop.run_in_executor(self._cloud_pool, run_command)
     
     async def _execute_fetchall_cloud(self, query: str, params: tuple = ()) -> list:
         """Execute a query and fetch all results from cloud database"""
@@ -115,133 +283,155 @@ class DatabaseManager:
                 conn = self._get_sync_connection()
                 cursor = conn.execute(query, params)
                 results = cursor.fetchall()
-                conn.close()
                 return results
             except Exception as e:
-                print(f"Cloud database fetchall error: {e}")
+                self._drop_sync_connection()
+                logger.error("Cloud database fetchall error: %s", e)
                 return []
         
-        return await loop.run_in_executor(None, run_query)
+        return await loop.run_in_executor(self._cloud_pool, run_query)
+    
+    async def _execute_returning_cloud(self, command: str, params: tuple = ()) -> Optional[Any]:
+        """Execute and commit a RETURNING command on cloud database asynchronously"""
+        loop = asyncio.get_event_loop()
+        
+        def run_command():
+            try:
+                conn = self._get_sync_connection()
+                cursor = conn.execute(command, params)
+                row = cursor.fetchone()
+                conn.commit()
+                return row
+            except Exception as e:
+                self._drop_sync_connection()
+                logger.error("Cloud database command error: %s", e)
+                return None
+        
+        return await loop.run_in_executor(self._cloud_pool, run_command)
+    
+    async def _execute_many_cloud(self, command: str, seq_of_params: list) -> bool:
+        """Execute a command for every parameter tuple in one cloud transaction"""
+        loop = asyncio.get_event_loop()
+        
+        def run_command():
+            try:
+                conn = self._get_sync_connection()
+                conn.executemany(command, seq_of_params)
+                conn.commit()
+                return True
+            except Exception as e:
+                self._drop_sync_connection()
+                logger.error("Cloud database executemany error: %s", e)
+                return False
+        
+        return await loop.run_in_executor(self._cloud_pool, run_command)
     
     async def get_channel_engagement(self, channel_id: str, engagement_type: str) -> Optional[Dict[str, Any]]:
         """Retrieve channel engagement data by channel_id and engagement_type"""
+        key = (channel_id, engagement_type)
+        cache = self._read_cache
+        if cache is not None:
+            value = cache.get(key)
+            if value is not None:
+                return self._decode(value)
+        generation = self._write_generations.get(key, 0)
         try:
-            query = "SELECT json_response FROM channel_engagement WHERE channel_id = ? AND engagement_type = ?"
-            params = (channel_id, engagement_type)
+            row = await self._fetchone(_SELECT_ONE_SQL, key)
             
-            if self.is_cloud:
-                row = await self._execute_query_cloud(query, params)
-            else:
-                async with aiosqlite.connect(self.db_path) as db:
-                    cursor = await db.execute(query, params)
-                    row = await cursor.fetchone()
-            
-            if row:
-                return json.loads(row[0]) if row[0] else None
-            return None
+            # Misses aren't cached, so a row saved by another writer shows up at once
+            if not row or not row[0]:
+                return None
+            if cache is not None and self._write_generations.get(key, 0) == generation:
+                cache[key] = row[0]
+            return self._decode(row[0])
         except Exception as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             return None
     
-    async def save_channel_engagement(self, channel_id: str, engagement_type: str, data: Dict[str, Any]) -> bool:
-        """Save or update channel engagement data"""
+    def _invalidate(self, key: tuple):
+        """Drop a cached row after a save and mark reads already in flight as stale"""
+        if self._read_cache is not None:
+            self._write_generations[key] = self._write_generations.get(key, 0) + 1
+            self._read_cache.pop(key, None)
+    
+    async def save_channel_engagement(self, channel_id: str, engagement_type: str,
+                                      data: Union[Dict[str, Any], bytes]) -> bool:
+        """Save or update channel engagement data (a dict, or already-serialized JSON bytes)"""
         try:
-            print(f"🔧 Database: Attempting to save data for channel {channel_id}")
-            print(f"📊 Database: Engagement type: {engagement_type}")
-            print(f"📝 Database: Data keys: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
+            logger.debug("🔧 Database: Saving channel=%s type=%s keys=%s",
+                         channel_id, engagement_type, _LazyKeys(data))
             
-            command = """INSERT OR REPLACE INTO channel_engagement 
-                        (channel_id, engagement_type, json_response) 
-                        VALUES (?, ?, ?)"""
-            params = (channel_id, engagement_type, json.dumps(data))
+            params = (channel_id, engagement_type, self._encode(data))
+            result = await self._execute_returning(_UPSERT_RETURNING_SQL, params) is not None
+            self._invalidate((channel_id, engagement_type))
             
-            if self.is_cloud:
-                print(f"🌩️  Database: Using SQLite Cloud")
-                result = await self._execute_command_cloud(command, params)
-            else:
-                print(f"🗂️  Database: Using local SQLite at {self.db_path}")
-                async with aiosqlite.connect(self.db_path) as db:
-                    print("✅ Database: Connection established")
-                    await db.execute(command, params)
-                    print("✅ Database: Execute completed")
-                    await db.commit()
-                    print("✅ Database: Commit completed")
-                    result = True
+            if not result:
+                logger.warning("❌ Database: Save failed for channel=%s type=%s", channel_id, engagement_type)
             
-            if result:
-                print("✅ Database: Save operation completed successfully")
-            else:
-                print("❌ Database: Save operation failed")
+            return result
+        except Exception:
+            logger.exception("💥 Database save error for channel=%s type=%s", channel_id, engagement_type)
+            return False
+    
+    async def save_many(self, channel_id: str, items: Dict[str, Dict[str, Any]]) -> bool:
+        """Save or update several engagement types for a channel in a single transaction"""
+        if not items:
+            return True
+        try:
+            seq_of_params = [
+                (channel_id, engagement_type, self._encode(data))
+                for engagement_type, data in items.items()
+            ]
+            result = await self._executemany(_UPSERT_SQL, seq_of_params)
+            for engagement_type in items:
+                self._invalidate((channel_id, engagement_type))
+            
+            if not result:
+                logger.warning("❌ Database: Batch save failed for channel=%s", channel_id)
             
             return result
-        except Exception as e:
-            print(f"💥 Database save error: {e}")
-            print(f"📋 Database error type: {type(e).__name__}")
-            import traceback
-            print(f"🔍 Database full traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("💥 Database batch save error for channel=%s", channel_id)
             return False
     
     async def get_all_engagement_types(self, channel_id: str) -> Dict[str, Any]:
         """Get all engagement types for a specific channel"""
         try:
-            query = "SELECT engagement_type, json_response FROM channel_engagement WHERE channel_id = ?"
-            params = (channel_id,)
+            rows = await self._fetchall(_SELECT_ALL_SQL, (channel_id,))
             
-            if self.is_cloud:
-                rows = await self._execute_fetchall_cloud(query, params)
-            else:
-                async with aiosqlite.connect(self.db_path) as db:
-                    cursor = await db.execute(query, params)
-                    rows = await cursor.fetchall()
-            
-            result = {}
-            for row in rows:
-                engagement_type, json_data = row
-                result[engagement_type] = json.loads(json_data) if json_data else None
-            
-            return result
+            decode = self._decode
+            return {engagement_type: decode(json_data) for engagement_type, json_data in rows}
         except Exception as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             return {}
     
     async def create_table_if_not_exists(self):
         """Create the channel_engagement table if it doesn't exist"""
-        try:
-            print(f"🔧 Database: Creating table if not exists")
-            
-            command = """
-                CREATE TABLE IF NOT EXISTS channel_engagement (
-                    channel_id TEXT NOT NULL,
-                    engagement_type TEXT NOT NULL,
-                    json_response TEXT,
-                    PRIMARY KEY (channel_id, engagement_type)
-                )
-            """
-            
-            if self.is_cloud:
-                print(f"🌩️  Database: Creating table in SQLite Cloud")
-                result = await self._execute_command_cloud(command, ())
-            else:
-                print(f"🗂️  Database: Creating table in local SQLite at {self.db_path}")
-                async with aiosqlite.connect(self.db_path) as db:
-                    print("✅ Database: Table creation connection established")
-                    await db.execute(command)
-                    print("✅ Database: Table creation execute completed")
-                    await db.commit()
-                    print("✅ Database: Table creation commit completed")
-                    result = True
-            
-            if result:
-                print("✅ Database: Table creation completed successfully")
-            else:
-                print("❌ Database: Table creation failed")
+        if self._tables_ready:
+            return True
+        async with self._schema_lock:
+            if self._tables_ready:
+                return True
+            try:
+                result = await self._execute(_CREATE_TABLE_SQL, ())
                 
-            return result
+                if result:
+                    logger.debug("✅ Database: channel_engagement table ready")
+                    self._tables_ready = True
+                else:
+                    logger.warning("❌ Database: Table creation failed")
+                    
+                return result
+            except Exception:
+                logger.exception("💥 Table creation error")
+                return False
+    
+    async def ping(self) -> bool:
+        """Check that the database answers a trivial query"""
+        try:
+            return await self._fetchone("SELECT 1", ()) is not None
         except Exception as e:
-            print(f"💥 Table creation error: {e}")
-            print(f"📋 Table creation error type: {type(e).__name__}")
-            import traceback
-            print(f"🔍 Table creation full traceback: {traceback.format_exc()}")
+            logger.warning("Database ping failed: %s", e)
             return False
 
 # Global database manager instance
@@ -3,15 +3,62 @@ Example workflow demonstrating the complete Keyword Intelligence Assistant funct
 including database integration for channel engagement data.
 """
 
+import asyncio
+import os
+import httpx
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 from datetime import datetime
 
+# uvloop's libuv event loop schedules the many small HTTP tasks more cheaply;
+# fall back to the stdlib loop where it isn't installed (e.g. on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 BASE_URL = "http://localhost:8000"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# /analyze-keywords doesn't store its result, so step 4 shows the step 1
+# response by default. Set VERIFY_DB=1 to look up a keyword_analysis row
+# saved for the channel through /channel-engagement instead
+VERIFY_DB = os.getenv("VERIFY_DB", "false").lower() in ("true", "1", "yes", "on")
+
+# Pooled, retrying session for the synchronous calls
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.2))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+async def post_engagement(client, channel_id, engagement_type, data):
+    """Save one engagement dataset, returning (engagement_type, status, body text)"""
+    payload = {
+        "channel_id": channel_id,
+        "engagement_type": engagement_type,
+        "data": data
+    }
+    response = await client.post("/channel-engagement", content=orjson.dumps(payload), headers=JSON_HEADERS)
+    return engagement_type, response.status_code, response.text
 
-def example_workflow():
+async def get_json(client, path):
+    """GET a path, returning (status, parsed JSON or None, body text)"""
+    response = await client.get(path)
+    return response.status_code, (orjson.loads(response.content) if response.status_code == 200 else None), response.text
+
+async def example_workflow():
     """Complete workflow example"""
     
+    # One client for the whole workflow; with HTTP/2 (TLS endpoints) all
+    # requests multiplex over a single connection, otherwise keep-alive reuses it
+    async with httpx.AsyncClient(http2=True, base_url=BASE_URL, timeout=30.0) as client:
+        await _run_workflow(client)
+
+async def _run_workflow(client):
+    """Workflow steps, sharing one HTTP client"""
     print("🚀 Keyword Intelligence Assistant - Complete Workflow Example")
     print("=" * 70)
     
@@ -39,31 +86,35 @@ def example_workflow():
         "channel_id": channel_id
     }
     
-    print("📊 Step 1: Performing keyword analysis with database storage...")
+    print("📊 Step 1: Performing keyword analysis...")
     
-    # Analyze keywords (will automatically save to database)
-    response = requests.post(f"{BASE_URL}/analyze-keywords", json=channel_data)
+    # Analyze keywords (the result is returned, not saved)
+    response = await client.post("/analyze-keywords", content=orjson.dumps(channel_data), headers=JSON_HEADERS)
+    status = response.status_code
+    body = response.content
     
-    if response.status_code == 200:
-        analysis = response.json()
+    if status == 200:
+        analysis = orjson.loads(body)
+        top_kws = analysis['top_keywords']
         print("✅ Keyword analysis completed!")
-        print(f"   📈 Found {len(analysis['top_keywords'])} keywords")
+        print(f"   📈 Found {len(top_kws)} keywords")
         print(f"   📂 Categorized into {len(analysis['keyword_categories'])} categories")
         print(f"   💡 Generated {len(analysis['recommendations'])} recommendations")
         
         # Display top 5 keywords
         print("\n🔥 Top 5 Keywords:")
-        for i, kw in enumerate(analysis['top_keywords'][:5], 1):
-            print(f"   {i}. {kw.keyword} ({kw.frequency} times)")
+        for i, kw in enumerate(top_kws[:5], 1):
+            print(f"   {i}. {kw['keyword']} ({kw['frequency']} times)")
         
     else:
-        print(f"❌ Keyword analysis failed: {response.text}")
+        print(f"❌ Keyword analysis failed: {body.decode()}")
         return
     
     print("\n" + "="*50)
     print("📁 Step 2: Saving additional engagement data...")
     
-    # Sample engagement data to save
+    # Sample engagement data to save, all stamped with the same time
+    now_iso = datetime.now().isoformat()
     engagement_datasets = {
         "comments": {
             "total_comments": 2850,
@@ -71,7 +122,7 @@ def example_workflow():
             "top_commenters": ["@techfan2024", "@pythonlover", "@reactdev"],
             "most_common_words": ["amazing", "helpful", "tutorial", "great"],
             "engagement_rate": 0.12,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         },
         "likes": {
             "total_likes": 45600,
@@ -79,7 +130,7 @@ def example_workflow():
             "like_ratio": 0.974,
             "trending_videos": ["Complete Python Course 2024", "React.js Full Tutorial"],
             "monthly_growth": 0.15,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         },
         "views": {
             "total_views": 892000,
@@ -92,7 +143,7 @@ def example_workflow():
                 "45+": 5
             },
             "top_countries": ["US", "India", "UK", "Canada", "Germany"],
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         },
         "subscribers": {
             "total_subscribers": 125000,
@@ -103,33 +154,39 @@ def example_workflow():
                 "external": 15,
                 "direct": 10
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
     }
     
-    # Save each engagement type
-    for engagement_type, data in engagement_datasets.items():
-        payload = {
-            "channel_id": channel_id,
-            "engagement_type": engagement_type,
-            "data": data
-        }
-        
-        response = requests.post(f"{BASE_URL}/channel-engagement", json=payload)
-        
-        if response.status_code == 200:
+    # Save each engagement type concurrently
+    async with asyncio.TaskGroup() as tg:
+        tasks = [
+            tg.create_task(post_engagement(client, channel_id, engagement_type, data))
+            for engagement_type, data in engagement_datasets.items()
+        ]
+    
+    for task in tasks:
+        engagement_type, status, text = task.result()
+        if status == 200:
             print(f"✅ Saved {engagement_type} data")
         else:
-            print(f"❌ Failed to save {engagement_type}: {response.text}")
+            print(f"❌ Failed to save {engagement_type}: {text}")
     
     print("\n" + "="*50)
     print("🔍 Step 3: Retrieving and displaying stored data...")
     
-    # Get all engagement data for the channel
-    response = requests.get(f"{BASE_URL}/channel-engagement/{channel_id}")
+    # Steps 3 and 4 only read, so fetch both at once; the keyword analysis
+    # is only re-read from the database when verifying
+    if VERIFY_DB:
+        (status, all_data, text), (keyword_status, result, keyword_text) = await asyncio.gather(
+            get_json(client, f"/channel-engagement/{channel_id}"),
+            get_json(client, f"/channel-engagement/{channel_id}/keyword_analysis"),
+        )
+    else:
+        status, all_data, text = await get_json(client, f"/channel-engagement/{channel_id}")
     
-    if response.status_code == 200:
-        all_data = response.json()
+    # Get all engagement data for the channel
+    if status == 200:
         print(f"📊 Retrieved data for channel: {all_data['channel_id']}")
         print(f"📈 Total engagement types: {all_data['total_engagement_types']}")
         
@@ -156,16 +213,19 @@ def example_workflow():
             print(f"   📈 Monthly Growth: +{subs_data.get('monthly_growth', 'N/A'):,}")
         
     else:
-        print(f"❌ Failed to retrieve channel data: {response.text}")
+        print(f"❌ Failed to retrieve channel data: {text}")
     
     print("\n" + "="*50)
     print("🔍 Step 4: Retrieving keyword analysis from database...")
     
-    # Retrieve the keyword analysis that was automatically saved
-    response = requests.get(f"{BASE_URL}/channel-engagement/{channel_id}/keyword_analysis")
-    
-    if response.status_code == 200:
-        result = response.json()
+    if not VERIFY_DB:
+        # Nothing was stored by step 1, so show its response again
+        print("✅ Using keyword analysis from step 1 (set VERIFY_DB=1 to look up a stored one)")
+        print(f"   📅 Analysis timestamp: {analysis.get('analysis_timestamp', 'N/A')}")
+        print(f"   🎯 Top keyword: {top_kws[0]['keyword'] if top_kws else 'N/A'}")
+        print(f"   📊 Total videos analyzed: {analysis.get('total_videos_analyzed', 'N/A')}")
+    # Retrieve a keyword analysis previously saved for the channel
+    elif keyword_status == 200:
         if result['found']:
             saved_analysis = result['data']
             print("✅ Retrieved saved keyword analysis")
@@ -175,7 +235,7 @@ def example_workflow():
         else:
             print("⚠️  No keyword analysis found in database")
     else:
-        print(f"❌ Failed to retrieve keyword analysis: {response.text}")
+        print(f"❌ Failed to retrieve keyword analysis: {keyword_text}")
     
     print("\n" + "="*50)
     print("✅ Workflow completed successfully!")
@@ -189,9 +249,9 @@ def example_workflow():
 def check_api_health():
     """Check if the API is running and healthy"""
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = SESSION.get(f"{BASE_URL}/health")
         if response.status_code == 200:
-            health = response.json()
+            health = orjson.loads(response.content)
             print(f"✅ API Status: {health['status']}")
             print(f"🗄️  Database: {health['database_status']}")
             return True
@@ -210,7 +270,10 @@ if __name__ == "__main__":
     # Check API health first
     if check_api_health():
         print()
-        example_workflow()
+        if UVLOOP_AVAILABLE:
+            uvloop.run(example_workflow())
+        else:
+            asyncio.run(example_workflow())
     else:
         print("\n❌ Cannot proceed without a healthy API connection.")
         print("Please start the API server and try again.") 
\ No newline at end of file
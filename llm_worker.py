@@ -0,0 +1,63 @@
+"""
+Persistent LLM Worker for the debug script
+Loads the debug LLM pipeline once and serves it over HTTP so repeated debug_llm.py
+runs skip model loading.
+
+Usage:
+    python llm_worker.py
+    LLM_WORKER_URL=http://127.0.0.1:8765 python debug_llm.py
+"""
+
+import asyncio
+import os
+import orjson
+import torch
+from aiohttp import web
+from debug_llm import MODEL_ID, load_text_generator
+
+WORKER_HOST = os.getenv("LLM_WORKER_HOST", "127.0.0.1")
+WORKER_PORT = int(os.getenv("LLM_WORKER_PORT", "8765"))
+
+def _generate(text_generator, prompt: str, max_new_tokens: int):
+    """Call the pipeline without autograd bookkeeping"""
+    # inference_mode is thread-local, so it's entered in the worker thread itself
+    with torch.inference_mode():
+        return text_generator(prompt, max_new_tokens=max_new_tokens, num_return_sequences=1)
+
+async def generate(request):
+    """Run one generation on the warm pipeline"""
+    body = orjson.loads(await request.read())
+    text_generator = request.app["text_generator"]
+    
+    # The pipeline isn't safe to call concurrently; run it off the event loop one at a time
+    async with request.app["generate_lock"]:
+        result = await asyncio.to_thread(
+            _generate,
+            text_generator,
+            body["prompt"],
+            int(body.get("max_new_tokens", 50)),
+        )
+    
+    return web.Response(
+        body=orjson.dumps({"generated_text": result[0]["generated_text"]}),
+        content_type="application/json",
+    )
+
+async def health(request):
+    """Report that the worker is up and the model is loaded"""
+    return web.json_response({"status": "ready"})
+
+def create_app() -> web.Application:
+    """Load the model once and build the worker app"""
+    print(f"🤖 Loading {MODEL_ID} model into worker...")
+    app = web.Application()
+    # from_pretrained memory-maps safetensors weights, so reloads hit the page cache
+    app["text_generator"] = load_text_generator(allow_remote=False)
+    app["generate_lock"] = asyncio.Lock()
+    app.router.add_post("/generate", generate)
+    app.router.add_get("/health", health)
+    print(f"✅ Worker ready on http://{WORKER_HOST}:{WORKER_PORT}")
+    return app
+
+if __name__ == "__main__":
+    web.run_app(create_app(), host=WORKER_HOST, port=WORKER_PORT)
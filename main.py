@@ -1,30 +1,52 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any, Union
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Dict, Optional, Any, Tuple, Union
 import re
 from collections import Counter
 import nltk
 from textblob import TextBlob
 import uvicorn
-import pandas as pd
 from database import db_manager
 from config import settings
 import warnings
 import asyncio
 import json
+import hashlib
+import orjson
 import logging
+import logging.handlers
+import atexit
+import queue
+import sys
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Dict, List, Optional, Any
-from concurrent.futures import ThreadPoolExecutor
-import threading
-import requests
+import httpx
+from cachetools import LRUCache, TTLCache
 
 # Suppress transformer warnings for cleaner output
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging. Records are queued and written by a listener thread,
+# so request handlers never block on console I/O
+if hasattr(sys.stderr, "reconfigure"):
+    # Log messages carry emoji; don't fail on consoles with a legacy code page
+    sys.stderr.reconfigure(encoding="utf-8", errors="replace")
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+# Follows API_LOG_LEVEL; uvicorn's extra "trace" level maps to DEBUG and an
+# unrecognised value falls back to INFO
+_log_level = {**logging.getLevelNamesMapping(), "TRACE": logging.DEBUG}.get(
+    settings.api_log_level.upper(), logging.INFO
+)
+logging.basicConfig(level=_log_level, handlers=[logging.handlers.QueueHandler(_log_queue)])
 logger = logging.getLogger(__name__)
+# httpx logs every Ollama request at INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
 # Download required NLTK data
 try:
@@ -38,29 +60,79 @@ except LookupError:
     nltk.download('stopwords')
 
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from nltk.tokenize import TreebankWordTokenizer
+
+# Text preprocessing singletons, built once at import instead of per call
+try:
+    STOPWORDS_EN: frozenset = frozenset(stopwords.words('english'))
+except LookupError:
+    # Stopwords corpus couldn't be downloaded; run without stopword filtering
+    logger.warning("NLTK stopwords corpus unavailable, stopword filtering disabled")
+    STOPWORDS_EN = frozenset()
+
+# Treebank tokenization is regex-only, so no punkt model lookup per call
+_TOKENIZER = TreebankWordTokenizer()
+
+def tokenize(text: str) -> List[str]:
+    """Split text into word tokens"""
+    return _TOKENIZER.tokenize(text)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources before serving requests and release them on shutdown"""
+    global ollama_available
+    
+    # Create the database schema once before serving requests
+    await db_manager.create_table_if_not_exists()
+    
+    # One pooled client for all Ollama calls so connections are kept alive;
+    # concurrency is left to Ollama's own OLLAMA_NUM_PARALLEL queueing
+    app.state.http = httpx.AsyncClient(
+        base_url=settings.ollama_base_url,
+        timeout=analyzer.llm_service.timeout,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60)
+    )
+    
+    # Check Ollama connection on startup
+    ollama_available = await check_ollama_connection(app.state.http)
+    if ollama_available:
+        await analyzer.llm_service.warm_up()
+    
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+        # Release the shared database connection
+        await db_manager.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="YouTube Channel Strategy Analyzer",
     description="AI-powered channel analysis and strategic recommendations",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
+_SLASH_RE = re.compile(r"/+")
+
 # URL normalization middleware to handle double slashes
-@app.middleware("http")
 async def normalize_path_middleware(request, call_next):
     """Normalize URL paths to handle double slashes and trailing slashes"""
-    # Normalize double slashes to single slashes
-    if "//" in str(request.url.path) and str(request.url.path) != "/":
-        normalized_path = str(request.url.path).replace("//", "/")
-        # Rebuild the URL with normalized path
+    # Read the raw scope path; request.url would rebuild a URL object per request
+    path = request.scope.get("path", "/")
+    if "//" in path:
+        # Collapse runs of slashes to single slashes
+        normalized_path = _SLASH_RE.sub("/", path)
         request.scope["path"] = normalized_path
         request.scope["raw_path"] = normalized_path.encode()
     
     response = await call_next(request)
     return response
 
+# Skip the middleware entirely when a reverse proxy already normalizes paths
+if settings.normalize_paths:
+    app.middleware("http")(normalize_path_middleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -70,44 +142,53 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-def check_ollama_connection():
+async def check_ollama_connection(client: httpx.AsyncClient) -> bool:
     """Check if Ollama is running and the model is available"""
     try:
-        response = requests.get(f"{settings.ollama_base_url}/api/tags")
+        response = await client.get("/api/tags")
         if response.status_code == 200:
-            models = response.json().get("models", [])
+            models = orjson.loads(response.content).get("models", [])
             model_names = [model.get("name", "") for model in models]
             if settings.ollama_model in model_names:
-                print(f"✅ Ollama connection successful! Model {settings.ollama_model} is available")
+                logger.info("✅ Ollama connection successful! Model %s is available", settings.ollama_model)
                 return True
             else:
-                print(f"⚠️  Model {settings.ollama_model} not found in available models: {model_names}")
+                logger.warning("⚠️  Model %s not found in available models: %s", settings.ollama_model, model_names)
                 return False
         else:
-            print(f"❌ Ollama connection failed: {response.status_code}")
+            logger.error("❌ Ollama connection failed: %s", response.status_code)
             return False
     except Exception as e:
-        print(f"❌ Ollama connection error: {e}")
+        logger.error("❌ Ollama connection error: %s", e)
         return False
 
-# Check Ollama connection on startup
-ollama_available = check_ollama_connection()
+# Set by the lifespan handler once the Ollama connection has been checked
+ollama_available = False
 
 # Pydantic Models
+# Shared config: immutable models; client data is kept exactly as sent
+_MODEL_CONFIG = ConfigDict(frozen=True)
+
 class ChannelStrategyRequest(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     channel_id: str = Field(..., description="YouTube channel ID")
     region: str = Field("global", description="Target region for analysis")
     language: str = Field("en", description="Target language for analysis")
 
 class StrategicInsights(BaseModel):
-    trending_topics: List[str] = Field(..., description="Trending topics not covered by channel")
-    keyword_gaps: List[str] = Field(..., description="Keywords competitors cover but channel doesn't")
-    title_suggestions: List[str] = Field(..., description="Video title suggestions based on keywords")
-    keyword_clusters: Dict[str, List[str]] = Field(..., description="Related keywords grouped for content series")
-    viewer_questions: List[str] = Field(..., description="Questions viewers might search for")
-    regional_keywords: List[str] = Field(..., description="Keywords tailored for target region/language")
+    model_config = _MODEL_CONFIG
+    
+    trending_topics: list[str] = Field(..., description="Trending topics not covered by channel")
+    keyword_gaps: list[str] = Field(..., description="Keywords competitors cover but channel doesn't")
+    title_suggestions: list[str] = Field(..., description="Video title suggestions based on keywords")
+    keyword_clusters: dict[str, list[str]] = Field(..., description="Related keywords grouped for content series")
+    viewer_questions: list[str] = Field(..., description="Questions viewers might search for")
+    regional_keywords: list[str] = Field(..., description="Keywords tailored for target region/language")
 
 class ChannelStrategyResponse(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     channel_id: str = Field(..., description="YouTube channel ID")
     analysis_timestamp: str = Field(..., description="When analysis was performed")
     region: str = Field(..., description="Target region analyzed")
@@ -115,335 +196,510 @@ class ChannelStrategyResponse(BaseModel):
     strategic_insights: StrategicInsights = Field(..., description="Comprehensive strategic recommendations")
 
 class ChannelEngagementSave(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     channel_id: str = Field(..., description="YouTube channel ID")
     engagement_type: str = Field(..., description="Type of engagement")
     data: Dict[str, Any] = Field(..., description="JSON data to store")
 
 class ChannelEngagementResponse(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     channel_id: str = Field(..., description="YouTube channel ID")
     engagement_type: str = Field(..., description="Type of engagement")
     data: Optional[Dict[str, Any]] = Field(None, description="Retrieved JSON data")
     found: bool = Field(..., description="Whether data was found")
 
 class KeywordAnalysisRequest(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     channel_id: str = Field(..., description="YouTube channel ID")
     keywords: List[str] = Field(..., description="List of keywords to analyze")
     region: str = Field("global", description="Target region for analysis")
     language: str = Field("en", description="Target language for analysis")
 
+class KeywordBatch(BaseModel):
+    model_config = _MODEL_CONFIG
+    
+    keywords: List[str] = Field(..., description="List of keywords to analyze")
+    region: str = Field("global", description="Target region for analysis")
+    language: str = Field("en", description="Target language for analysis")
+
+# Most keyword sets one /analyze-keywords-batch request may submit; each set
+# runs a full strategic analysis
+MAX_KEYWORD_BATCHES = 10
+
+class KeywordBatchAnalysisRequest(BaseModel):
+    model_config = _MODEL_CONFIG
+    
+    channel_id: str = Field(..., description="YouTube channel ID")
+    batches: List[KeywordBatch] = Field(..., description="Keyword sets to analyze in one request")
+
+class KeywordBatchAnalysisResponse(BaseModel):
+    model_config = _MODEL_CONFIG
+    
+    results: List[ChannelStrategyResponse] = Field(..., description="One analysis per keyword set, in request order")
+
+@dataclass(frozen=True, slots=True)
+class PromptSpec:
+    """A strategic analysis prompt with the JSON key it asks the LLM to return"""
+    key: str
+    text: str
+    # Comma-joined keywords on the prompt's "Keywords:" line, used for fallbacks
+    keywords: str = ""
+    # Shared instructions sent as Ollama's system field
+    system: str = ""
+
+def precompute_kw_joins(keywords: List[str]) -> Dict[int, str]:
+    """Join each keyword truncation the prompts use, once per analysis"""
+    # Sorted after truncation so the same keywords always produce the same
+    # prompt text (and hit the response cache)
+    return {n: ", ".join(sorted(keywords[:n])) for n in (5, 6, 8, 12)}
+
 class LLMPrompts:
     """Centralized prompts for strategic analysis"""
     
     @staticmethod
-    def trending_topics_prompt(channel_data: str, region: str, language: str) -> str:
-        return f"""Generate trending topics for YouTube channel analysis.
+    def system_prefix(channel_data: str, region: str, language: str) -> str:
+        """Instructions and channel context shared by every analysis of one request"""
+        # Sent as Ollama's system field; keeping it byte-identical across the
+        # analyses lets the server reuse its KV cache for this prefix
+        return f"""You are a YouTube channel strategy analyst.
 
 Channel content: {channel_data}
 Target region: {region}
 Target language: {language}
 
-Return ONLY a valid JSON object with this exact format:
-{{"trending_topics": ["topic1", "topic2", "topic3", "topic4", "topic5"]}}
-
+Return ONLY a valid JSON object with the exact format given in the task.
 Do not include any explanations, examples, or additional text. Only return the JSON object."""
 
     @staticmethod
-    def keyword_gaps_prompt(channel_keywords: List[str], region: str, language: str) -> str:
-        return f"""Find keyword gaps for YouTube channel analysis.
+    def combined_prompt(system: str, keyword_joins: Dict[int, str]) -> PromptSpec:
+        return PromptSpec("trending_topics", f"""Task: full strategic analysis.
+Channel currently covers: {keyword_joins[8]}
+Keywords: {keyword_joins[12]}
 
-Channel currently covers: {', '.join(channel_keywords[:8])}
-Target region: {region}
-Target language: {language}
+Format:
+{{"trending_topics": ["topic1", "topic2", "topic3", "topic4", "topic5"],
+ "keyword_gaps": ["gap1", "gap2", "gap3", "gap4", "gap5"],
+ "title_suggestions": ["Title 1", "Title 2", "Title 3", "Title 4", "Title 5"],
+ "keyword_clusters": {{"series1": ["kw1", "kw2"], "series2": ["kw3", "kw4"], "series3": ["kw5", "kw6"]}},
+ "viewer_questions": ["Q1?", "Q2?", "Q3?", "Q4?", "Q5?", "Q6?"],
+ "regional_keywords": ["local1", "local2", "local3", "local4", "local5"]}}""", keyword_joins[12], system)
 
-Return ONLY a valid JSON object with this exact format:
-{{"keyword_gaps": ["gap1", "gap2", "gap3", "gap4", "gap5"]}}
+    @staticmethod
+    def trending_topics_prompt(system: str) -> PromptSpec:
+        return PromptSpec("trending_topics", """Task: trending topics for this channel.
 
-Do not include any explanations, examples, or additional text. Only return the JSON object."""
+Format:
+{"trending_topics": ["topic1", "topic2", "topic3", "topic4", "topic5"]}""", "", system)
 
     @staticmethod
-    def title_suggestions_prompt(top_keywords: List[str], region: str, language: str) -> str:
-        return f"""Generate YouTube video title suggestions.
+    def keyword_gaps_prompt(system: str, channel_keywords: str) -> PromptSpec:
+        return PromptSpec("keyword_gaps", f"""Task: keyword gaps.
+Channel currently covers: {channel_keywords}
 
-Keywords: {', '.join(top_keywords[:5])}
-Target region: {region}
-Target language: {language}
+Format:
+{{"keyword_gaps": ["gap1", "gap2", "gap3", "gap4", "gap5"]}}""", "", system)
 
-Return ONLY a valid JSON object with this exact format:
-{{"title_suggestions": ["Title 1", "Title 2", "Title 3", "Title 4", "Title 5"]}}
+    @staticmethod
+    def title_suggestions_prompt(system: str, top_keywords: str) -> PromptSpec:
+        return PromptSpec("title_suggestions", f"""Task: video title suggestions.
+Keywords: {top_keywords}
 
-Do not include any explanations, examples, or additional text. Only return the JSON object."""
+Format:
+{{"title_suggestions": ["Title 1", "Title 2", "Title 3", "Title 4", "Title 5"]}}""", top_keywords, system)
 
     @staticmethod
-    def keyword_clusters_prompt(keywords: List[str]) -> str:
-        return f"""Group keywords into content clusters.
+    def keyword_clusters_prompt(system: str, keywords: str) -> PromptSpec:
+        return PromptSpec("keyword_clusters", f"""Task: group keywords into content clusters.
+Keywords: {keywords}
 
-Keywords: {', '.join(keywords[:12])}
+Format:
+{{"keyword_clusters": {{"series1": ["kw1", "kw2"], "series2": ["kw3", "kw4"], "series3": ["kw5", "kw6"]}}}}""", keywords, system)
 
-Return ONLY a valid JSON object with this exact format:
-{{"keyword_clusters": {{"series1": ["kw1", "kw2"], "series2": ["kw3", "kw4"], "series3": ["kw5", "kw6"]}}}}
+    @staticmethod
+    def viewer_questions_prompt(system: str, keywords: str) -> PromptSpec:
+        return PromptSpec("viewer_questions", f"""Task: viewer questions.
+Keywords: {keywords}
 
-Do not include any explanations, examples, or additional text. Only return the JSON object."""
+Format:
+{{"viewer_questions": ["Q1?", "Q2?", "Q3?", "Q4?", "Q5?", "Q6?"]}}""", keywords, system)
 
     @staticmethod
-    def viewer_questions_prompt(keywords: List[str], region: str, language: str) -> str:
-        return f"""Generate viewer questions for YouTube content.
+    def regional_keywords_prompt(system: str, keywords: str) -> PromptSpec:
+        return PromptSpec("regional_keywords", f"""Task: regional keywords.
+Base keywords: {keywords}
 
-Keywords: {', '.join(keywords[:6])}
-Target region: {region}
-Target language: {language}
+Format:
+{{"regional_keywords": ["local1", "local2", "local3", "local4", "local5"]}}""", "", system)
 
-Return ONLY a valid JSON object with this exact format:
-{{"viewer_questions": ["Q1?", "Q2?", "Q3?", "Q4?", "Q5?", "Q6?"]}}
+# Most keywords taken from stored channel data; the prompts use at most 12
+MAX_PROMPT_KEYWORDS = 20
 
-Do not include any explanations, examples, or additional text. Only return the JSON object."""
+# Top-level key each strategic analysis prompt asks the LLM to return
+EXPECTED_KEYS = ("trending_topics", "keyword_gaps", "title_suggestions",
+                 "keyword_clusters", "viewer_questions", "regional_keywords")
 
-    @staticmethod
-    def regional_keywords_prompt(keywords: List[str], region: str, language: str) -> str:
-        return f"""Generate regional keywords for YouTube content.
+# Patterns used to salvage JSON from malformed LLM output, compiled once
+_JSON_PATTERNS = [re.compile(rf'\{{[^}}]*"{key}"[^}}]*\}}') for key in EXPECTED_KEYS]
+# The expected key used as a JSON-like object key, single or double quoted
+_KEY_PATTERNS = {key: re.compile(rf'["\']{key}["\']\s*:') for key in EXPECTED_KEYS}
+_LIST_RE = re.compile(r'\[([^\]]*)\]')
+_QUOTED_RE = re.compile(r'"([^"]*)"')
 
-Base keywords: {', '.join(keywords[:6])}
-Target region: {region}
-Target language: {language}
+# Content that marks an LLM response as off-task
+IRRELEVANT_PATTERNS = (
+    "please help me", "pull requests", "improve this code", "will not provide",
+    "i cannot", "i'm sorry", "i don't have", "i am not able",
+    "json object is created", "json endpoint", "json function",
+    "markup", "html", "xml", "javascript", "function"
+)
+_IRRELEVANT_RE = re.compile("|".join(map(re.escape, IRRELEVANT_PATTERNS)), re.IGNORECASE)
 
-Return ONLY a valid JSON object with this exact format:
-{{"regional_keywords": ["local1", "local2", "local3", "local4", "local5"]}}
+# Fallback responses used when the LLM gives no usable answer and the prompt
+# lists no keywords; built once since they never change
+_STATIC_FALLBACKS = {
+    "trending_topics": {"trending_topics": ["AI Trends", "Digital Transformation", "Remote Work", "Sustainability", "Health Tech"]},
+    "keyword_gaps": {"keyword_gaps": ["Emerging Technology", "Industry Insights", "Best Practices", "Case Studies", "Expert Tips"]},
+    "title_suggestions": {"title_suggestions": ["Top 5 Trends in 2024", "How to Master This Skill", "The Ultimate Guide", "Secrets Revealed", "What You Need to Know"]},
+    "keyword_clusters": {"keyword_clusters": {"Beginner": ["Basics", "Introduction", "Getting Started"], "Advanced": ["Expert Tips", "Advanced Techniques", "Pro Strategies"]}},
+    "viewer_questions": {"viewer_questions": ["How do I get started?", "What are the best practices?", "How can I improve?", "What should I avoid?", "What are the latest trends?", "How do I succeed?"]},
+    "regional_keywords": {"regional_keywords": ["Local Trends", "Regional Insights", "Cultural Relevance", "Local Best Practices", "Regional Success Stories"]},
+    "result": {"result": ["Sample response 1", "Sample response 2", "Sample response 3"]}
+}
 
-Do not include any explanations, examples, or additional text. Only return the JSON object."""
+# Keyword-based fallbacks: (number of items, templates applied to each keyword)
+_FALLBACK_TEMPLATES = {
+    "trending_topics": (5, ("{kw} Trends", "Latest {kw} News", "{kw} Innovation")),
+    "keyword_gaps": (5, ("Advanced {kw}", "{kw} Best Practices", "{kw} Case Studies")),
+    "title_suggestions": (5, ("Top 5 {kw} Tips", "How to Master {kw}", "The Ultimate {kw} Guide")),
+    "viewer_questions": (6, ("How do I get started with {kw}?", "What are the best {kw} practices?", "How can I improve my {kw} skills?")),
+    "regional_keywords": (5, ("Local {kw}", "{kw} in your region", "Regional {kw} trends"))
+}
+
+# Python-style literals and quotes LLMs tend to emit in place of JSON
+_QUOTE_TRANS = str.maketrans("'", '"')
+_PYLIT_RE = re.compile(r"\b(?:None|True|False)\b")
+_PYLIT_MAP = {"None": "null", "True": "true", "False": "false"}
+
+def _translate_py_literals(text: str) -> str:
+    """Rewrite single quotes and Python-style literals to JSON"""
+    # The quote swap is a C-level character map; only the words need the regex
+    return _PYLIT_RE.sub(lambda m: _PYLIT_MAP[m.group(0)], text.translate(_QUOTE_TRANS))
 
+def _loads_llm_json(text: str) -> Any:
+    """Parse LLM output as JSON, only translating Python-style literals if strict parsing fails"""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json.loads(_translate_py_literals(text))
+
+def _cluster_keywords_locally(keywords: List[str], max_clusters: int = 6) -> Optional[Dict[str, List[str]]]:
+    """Group keywords by character n-gram similarity, for when the LLM clustering fails"""
+    if len(keywords) < 2:
+        return None
+    try:
+        # Imported on first use; scikit-learn is slow to import and only needed here
+        import numpy as np
+        from sklearn.cluster import AgglomerativeClustering
+        from sklearn.feature_extraction.text import TfidfVectorizer
+    except ImportError:
+        return None
+    
+    try:
+        # TF-IDF rows are L2-normalized, so dot products are cosine similarities
+        vectors = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 4)).fit_transform(keywords).toarray()
+        labels = AgglomerativeClustering(n_clusters=None, distance_threshold=0.8, metric="cosine",
+                                         linkage="average").fit_predict(vectors)
+    except ValueError as e:
+        logger.debug("Local keyword clustering failed: %s", e)
+        return None
+    
+    # Largest clusters first, each named after the keyword nearest its centroid
+    clusters = {}
+    for label in np.argsort(-np.bincount(labels), kind="stable")[:max_clusters]:
+        members = np.flatnonzero(labels == label)
+        centroid = vectors[members].mean(axis=0)
+        name = keywords[members[np.argmax(vectors[members] @ centroid)]]
+        clusters[name] = [keywords[i] for i in members]
+    return clusters
+
+class _JsonObjectScanner:
+    """Incrementally tracks streamed text until its first top-level JSON object closes"""
+    __slots__ = ("depth", "in_string", "escaped", "started")
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+    
+    def feed(self, text: str) -> bool:
+        """Consume a chunk, returning True once the object is complete"""
+        for ch in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = self.started
+            elif ch == "{":
+                self.depth += 1
+                self.started = True
+            elif ch == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+class FallbackResponse(dict):
+    """Canned content returned in place of an LLM answer, so callers can tell the two apart"""
+    __slots__ = ()
 
 class AsyncLLMService:
     """Async service for LLM operations with Ollama integration"""
     
     def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=1)  # Reduced from 2 to 1 to avoid conflicts
         self.max_retries = 2
         self.timeout = 60  # Increased from 30s to 60s
-        self.model_lock = threading.Lock()  # Add lock to prevent concurrent access
-        self.base_url = settings.ollama_base_url
         self.model = settings.ollama_model
+        # How long Ollama keeps the model loaded after each request
+        self.keep_alive = "30m"
+        # Cap in-flight generations at the Ollama server's parallel slots so
+        # concurrent analyses queue here instead of thrashing the server
+        self._ollama_slots = asyncio.Semaphore(settings.ollama_num_parallel)
+        # Parsed responses keyed by prompt digest, max_tokens and temperature
+        self._response_cache: LRUCache = LRUCache(maxsize=4096)
+        self._cache_hits = 0
+        self._cache_misses = 0
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Report response cache usage"""
+        return {
+            "size": len(self._response_cache),
+            "maxsize": self._response_cache.maxsize,
+            "hits": self._cache_hits,
+            "misses": self._cache_misses
+        }
+    
+    def clear_cache(self) -> int:
+        """Drop all cached responses, returning how many were removed"""
+        removed = len(self._response_cache)
+        self._response_cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        return removed
+    
+    @staticmethod
+    def _cache_key(prompt: PromptSpec, max_tokens: int, temperature: float) -> str:
+        """Fixed-size cache key; the prompt is hashed so long prompts aren't kept as keys"""
+        digest = hashlib.blake2b(f"{prompt.system}\0{prompt.text}".encode(), digest_size=16).hexdigest()
+        return f"{digest}|{max_tokens}|{round(temperature, 2)}"
+    
+    async def warm_up(self):
+        """Load the model into Ollama with a one-token generation so the first real call skips the load"""
+        try:
+            await app.state.http.post("/api/generate", json={
+                "model": self.model,
+                "prompt": " ",
+                "stream": False,
+                "keep_alive": self.keep_alive,
+                "options": {"num_predict": 1}
+            })
+            logger.info("🔥 Ollama model %s warmed up", self.model)
+        except httpx.HTTPError as e:
+            logger.warning("⚠️  Ollama warm-up failed: %s", e)
     
-    async def generate_text_async(self, prompt: str, max_tokens: int = 200, temperature: float = 0.7) -> Optional[str]:
-        """Async wrapper for text generation with Ollama"""
+    async def generate_text_async(self, prompt: str, max_tokens: int = 200, temperature: float = 0.7,
+                                  system: str = "") -> Optional[str]:
+        """Generate text with Ollama over the shared async HTTP client"""
         if not ollama_available:
-            print("⚠️  Ollama not available")
+            logger.warning("⚠️  Ollama not available")
             return None
         
         try:
-            print(f"🤖 Ollama: Generating with {max_tokens} tokens, temp={temperature}")
-            print(f"📝 LLM Prompt: {prompt[:100]}...")
+            logger.debug("🤖 Ollama: Generating with %s tokens, temp=%s", max_tokens, temperature)
+            logger.debug("📝 LLM Prompt: %.100s...", prompt)
             
-            # Run the synchronous Ollama request in a thread pool with lock
-            loop = asyncio.get_event_loop()
+            # Prepare the request for Ollama; JSON mode constrains decoding to valid JSON,
+            # and streaming lets us stop as soon as the object is complete
+            payload = {
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "format": "json",
+                "keep_alive": self.keep_alive,  # Refresh the model's idle timer
+                "options": {
+                    "temperature": temperature,
+                    "num_predict": max_tokens,
+                    "num_ctx": 2048  # Prompts are short; avoid a larger default KV cache
+                }
+            }
+            if system:
+                # Shared prefix; a matching KV cache slot skips re-processing it
+                payload["system"] = system
             
-            def generate_text():
-                with self.model_lock:  # Use lock to prevent concurrent access
-                    try:
-                        # Prepare the request for Ollama
-                        payload = {
-                            "model": self.model,
-                            "prompt": prompt,
-                            "stream": False,
-                            "options": {
-                                "temperature": temperature,
-                                "num_predict": max_tokens
-                            }
-                        }
-                        
-                        response = requests.post(
-                            f"{self.base_url}/api/generate",
-                            json=payload,
-                            timeout=self.timeout
-                        )
-                        
-                        if response.status_code == 200:
-                            result = response.json()
-                            return result.get("response", "")
-                        else:
-                            print(f"❌ Ollama API error: {response.status_code} - {response.text}")
+            # Concurrent calls share the app's pooled client; the event loop
+            # keeps serving while they're in flight
+            async with self._ollama_slots:
+                # The client timeout only bounds each read, so a generation that
+                # keeps trickling tokens gets an overall deadline here
+                async with asyncio.timeout(self.timeout):
+                    async with app.state.http.stream("POST", "/api/generate", json=payload) as response:
+                        if response.status_code != 200:
+                            await response.aread()
+                            logger.warning("❌ Ollama API error: %s - %s", response.status_code, response.text)
                             return None
-                            
-                    except Exception as e:
-                        print(f"❌ Ollama generation error: {e}")
-                        return None
-            
-            # Execute with timeout
-            result = await asyncio.wait_for(
-                loop.run_in_executor(self.executor, generate_text),
-                timeout=self.timeout
-            )
+                        
+                        result = await self._read_stream(response)
             
             if result:
-                print(f"✅ Ollama Response: {result[:200]}...")
+                logger.debug("✅ Ollama Response: %.200s...", result)
                 return result
             return None
             
-        except asyncio.TimeoutError:
-            print(f"❌ Ollama generation timed out after {self.timeout}s")
+        except (httpx.TimeoutException, TimeoutError):
+            logger.warning("❌ Ollama generation timed out after %ss", self.timeout)
             return None
         except asyncio.CancelledError:
-            print(f"❌ Ollama generation was cancelled")
+            logger.warning("❌ Ollama generation was cancelled")
             return None
         except Exception as e:
-            print(f"❌ Ollama generation error: {e}")
+            logger.warning("❌ Ollama generation error: %s", e)
             return None
     
-    async def generate_structured_response(self, prompt: str, max_tokens: int = 150, 
-                                         temperature: float = 0.7, retries: int = None) -> Optional[Dict]:
+    @staticmethod
+    async def _read_stream(response: httpx.Response) -> str:
+        """Accumulate streamed tokens, stopping once they form a complete JSON object"""
+        parts = []
+        scanner = _JsonObjectScanner()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            chunk = orjson.loads(line)
+            parts.append(chunk.get("response", ""))
+            # Once the object is complete, leaving the stream early closes the
+            # connection, which is what makes Ollama abort the rest of the
+            # generation (in JSON mode it otherwise pads with whitespace up to
+            # num_predict, and a stop sequence can't tell where the object
+            # ends). That connection isn't returned to the pool, but reopening
+            # one to Ollama costs far less than those tokens. A response that
+            # ends on its own is read to the end so its connection is reused.
+            # The scanner only looks at each new token, instead of
+            # re-parsing everything so far
+            if not chunk.get("done") and scanner.feed(parts[-1]):
+                break
+        return "".join(parts)
+    
+    async def generate_structured_response(self, prompt: PromptSpec, max_tokens: int = 150, 
+                                         temperature: float = 0.7, retries: int = None,
+                                         use_fallback: bool = True) -> Optional[Dict]:
         """Generate structured JSON response with retries"""
         if retries is None:
             retries = self.max_retries
         
-        # Determine expected key from prompt
-        expected_key = None
-        if "trending_topics" in prompt:
-            expected_key = "trending_topics"
-        elif "keyword_gaps" in prompt:
-            expected_key = "keyword_gaps"
-        elif "title_suggestions" in prompt:
-            expected_key = "title_suggestions"
-        elif "keyword_clusters" in prompt:
-            expected_key = "keyword_clusters"
-        elif "viewer_questions" in prompt:
-            expected_key = "viewer_questions"
-        elif "regional_keywords" in prompt:
-            expected_key = "regional_keywords"
+        # Identical prompts give interchangeable answers; reuse a previous one
+        cache_key = self._cache_key(prompt, max_tokens, temperature)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            self._cache_hits += 1
+            logger.debug("♻️  LLM cache hit, skipping generation")
+            return cached
+        self._cache_misses += 1
         
         for attempt in range(retries + 1):
             try:
-                print(f"🔍 LLM Attempt {attempt + 1}: Generating response...")
-                raw_response = await self.generate_text_async(prompt, max_tokens, temperature)
+                logger.debug("🔍 LLM Attempt %s: Generating response...", attempt + 1)
+                raw_response = await self.generate_text_async(prompt.text, max_tokens, temperature,
+                                                             system=prompt.system)
                 if not raw_response:
-                    print(f"❌ LLM Attempt {attempt + 1}: No response generated")
+                    logger.warning("❌ LLM Attempt %s: No response generated", attempt + 1)
                     continue
                 
-                print(f"📝 LLM Raw Response: {raw_response[:200]}...")
+                logger.debug("📝 LLM Raw Response: %.200s...", raw_response)
                 
                 # Validate response relevance
-                if expected_key and not self._validate_llm_response(raw_response, expected_key):
-                    print(f"❌ LLM Attempt {attempt + 1}: Response is irrelevant, retrying...")
+                if not self._validate_llm_response(raw_response, prompt.key):
+                    logger.warning("❌ LLM Attempt %s: Response is irrelevant, retrying...", attempt + 1)
                     continue
                 
-                # Extract JSON from response
-                json_response = self._extract_json_from_response(raw_response, prompt)
+                # JSON mode responses parse directly; only run the extraction/repair
+                # pipeline when they don't
+                try:
+                    parsed = orjson.loads(raw_response)
+                    json_response = self._clean_response_data(parsed) if isinstance(parsed, dict) else None
+                except orjson.JSONDecodeError:
+                    json_response = None
+                if not json_response:
+                    json_response = self._extract_json_from_response(raw_response, prompt)
                 if json_response:
-                    print(f"✅ LLM Attempt {attempt + 1}: JSON extracted successfully")
+                    logger.debug("✅ LLM Attempt %s: JSON extracted successfully", attempt + 1)
+                    self._response_cache[cache_key] = json_response
                     return json_response
                 
-                print(f"❌ LLM Attempt {attempt + 1}: Failed to extract JSON")
+                logger.warning("❌ LLM Attempt %s: Failed to extract JSON", attempt + 1)
                 
             except Exception as e:
-                print(f"❌ LLM Attempt {attempt + 1} failed: {e}")
+                logger.warning("❌ LLM Attempt %s failed: %s", attempt + 1, e)
                 
             if attempt < retries:
                 await asyncio.sleep(1.0)  # Longer delay before retry
         
-        print(f"❌ All {retries + 1} attempts failed for prompt")
-        return self._generate_fallback_response(prompt)
+        logger.warning("❌ All %s attempts failed for prompt", retries + 1)
+        return self._generate_fallback_response(prompt) if use_fallback else None
     
-    def _generate_fallback_response(self, prompt: str) -> Dict:
+    def _generate_fallback_response(self, prompt: PromptSpec) -> FallbackResponse:
         """Generate fallback response when LLM fails"""
-        print("🔄 Generating fallback response...")
-        
-        # Extract keywords from prompt for more relevant fallbacks
-        keywords = []
-        if "Keywords:" in prompt:
-            try:
-                keywords_section = prompt.split("Keywords:")[1].split("\n")[0]
-                keywords = [kw.strip() for kw in keywords_section.split(",") if kw.strip()]
-            except:
-                keywords = ["content", "youtube", "videos"]
+        logger.debug("🔄 Generating fallback response...")
         
-        fallback_response = None
+        # Use the prompt's keywords for more relevant fallbacks
+        keywords = [kw.strip() for kw in prompt.keywords.split(",") if kw.strip()]
+        key = prompt.key
         
-        if "trending_topics" in prompt:
-            if keywords:
-                trending_list = []
-                for kw in keywords[:5]:
-                    trending_list.extend([f"{kw} Trends", f"Latest {kw} News", f"{kw} Innovation"])
-                fallback_response = {"trending_topics": trending_list[:5]}
-            else:
-                fallback_response = {"trending_topics": ["AI Trends", "Digital Transformation", "Remote Work", "Sustainability", "Health Tech"]}
-        elif "keyword_gaps" in prompt:
-            if keywords:
-                gaps_list = []
-                for kw in keywords[:5]:
-                    gaps_list.extend([f"Advanced {kw}", f"{kw} Best Practices", f"{kw} Case Studies"])
-                fallback_response = {"keyword_gaps": gaps_list[:5]}
-            else:
-                fallback_response = {"keyword_gaps": ["Emerging Technology", "Industry Insights", "Best Practices", "Case Studies", "Expert Tips"]}
-        elif "title_suggestions" in prompt:
-            if keywords:
-                titles_list = []
-                for kw in keywords[:5]:
-                    titles_list.extend([f"Top 5 {kw} Tips", f"How to Master {kw}", f"The Ultimate {kw} Guide"])
-                fallback_response = {"title_suggestions": titles_list[:5]}
-            else:
-                fallback_response = {"title_suggestions": ["Top 5 Trends in 2024", "How to Master This Skill", "The Ultimate Guide", "Secrets Revealed", "What You Need to Know"]}
-        elif "keyword_clusters" in prompt:
-            if keywords:
-                clusters = {}
-                for i, kw in enumerate(keywords[:6]):
-                    cluster_name = f"series{i+1}"
-                    clusters[cluster_name] = [kw, f"{kw} tips", f"{kw} guide"]
-                fallback_response = {"keyword_clusters": clusters}
-            else:
-                fallback_response = {"keyword_clusters": {"Beginner": ["Basics", "Introduction", "Getting Started"], "Advanced": ["Expert Tips", "Advanced Techniques", "Pro Strategies"]}}
-        elif "viewer_questions" in prompt:
-            if keywords:
-                questions_list = []
-                for kw in keywords[:6]:
-                    questions_list.extend([f"How do I get started with {kw}?", f"What are the best {kw} practices?", f"How can I improve my {kw} skills?"])
-                fallback_response = {"viewer_questions": questions_list[:6]}
-            else:
-                fallback_response = {"viewer_questions": ["How do I get started?", "What are the best practices?", "How can I improve?", "What should I avoid?", "What are the latest trends?", "How do I succeed?"]}
-        elif "regional_keywords" in prompt:
-            if keywords:
-                regional_list = []
-                for kw in keywords[:5]:
-                    regional_list.extend([f"Local {kw}", f"{kw} in your region", f"Regional {kw} trends"])
-                fallback_response = {"regional_keywords": regional_list[:5]}
-            else:
-                fallback_response = {"regional_keywords": ["Local Trends", "Regional Insights", "Cultural Relevance", "Local Best Practices", "Regional Success Stories"]}
+        if keywords and key == "keyword_clusters":
+            # One content series per keyword
+            fallback_response = {key: {f"series{i+1}": [kw, f"{kw} tips", f"{kw} guide"]
+                                       for i, kw in enumerate(keywords[:6])}}
+        elif keywords and key in _FALLBACK_TEMPLATES:
+            limit, templates = _FALLBACK_TEMPLATES[key]
+            items = [t.format_map({"kw": kw}) for kw in keywords[:limit] for t in templates]
+            fallback_response = {key: items[:limit]}
         else:
-            fallback_response = {"result": ["Sample response 1", "Sample response 2", "Sample response 3"]}
+            fallback_response = _STATIC_FALLBACKS.get(key, _STATIC_FALLBACKS["result"])
         
         # Clean the fallback response to ensure no key names are in list items
-        cleaned_response = self._clean_response_data(fallback_response)
-        print(f"🧹 Cleaned fallback response: {cleaned_response}")
+        # (copied first, since the static templates are shared)
+        cleaned_response = self._clean_response_data(FallbackResponse(fallback_response))
+        logger.debug("🧹 Cleaned fallback response: %s", cleaned_response)
         
         return cleaned_response
     
     def _clean_response_data(self, data: Dict) -> Dict:
         """Clean response data to remove key names from list items"""
-        print(f"🧹 Cleaning response data: {data}")
-        cleaned_data = {}
+        # Filters in place: callers pass dicts they own (freshly parsed or copied)
         for key, value in data.items():
-            if isinstance(value, list) and len(value) > 0:
+            if isinstance(value, list) and value:
                 # Remove any list items that are just the key name
-                cleaned_list = [item for item in value if item != key]
-                print(f"🧹 Cleaned {key}: {value} -> {cleaned_list}")
-                cleaned_data[key] = cleaned_list
-            else:
-                cleaned_data[key] = value
-        print(f"🧹 Final cleaned data: {cleaned_data}")
-        return cleaned_data
+                data[key] = [item for item in value if item != key]
+        return data
 
-    def _extract_json_from_response(self, response: str, prompt: str) -> Optional[Dict]:
+    def _extract_json_from_response(self, response: str, prompt: PromptSpec) -> Optional[Dict]:
         """Extract and validate JSON from LLM response"""
         try:
-            print(f"🔍 Extracting JSON from response...")
-            print(f"📝 Full response: {response}")
+            logger.debug("🔍 Extracting JSON from response...")
+            logger.debug("📝 Full response: %s", response)
             
             # Remove the prompt from response
-            clean_response = response.replace(prompt, "").strip()
-            print(f"🧹 Cleaned response: {clean_response}")
-            
-            # Check if response contains expected keys
-            expected_keys = ["trending_topics", "keyword_gaps", "title_suggestions", "keyword_clusters", "viewer_questions", "regional_keywords"]
-            has_expected_key = any(key in clean_response for key in expected_keys)
+            clean_response = response.replace(prompt.text, "").strip()
+            logger.debug("🧹 Cleaned response: %s", clean_response)
             
-            if not has_expected_key:
-                print(f"❌ Response does not contain expected JSON keys")
+            # Check if response contains the expected key
+            if prompt.key not in clean_response:
+                logger.warning("❌ Response does not contain expected JSON keys")
                 return None
             
             # Try to find JSON object in response
@@ -452,127 +708,90 @@ class AsyncLLMService:
             
             if json_start != -1 and json_end > json_start:
                 json_str = clean_response[json_start:json_end]
-                print(f"📋 Extracted JSON string: {json_str}")
-                
-                # Try to fix common JSON issues
-                json_str = json_str.replace("'", '"')  # Replace single quotes
-                json_str = json_str.replace("None", "null")  # Replace Python None
-                json_str = json_str.replace("True", "true")  # Replace Python True
-                json_str = json_str.replace("False", "false")  # Replace Python False
+                logger.debug("📋 Extracted JSON string: %s", json_str)
                 
                 # Remove any trailing text after the JSON
                 if json_str.count('{') == json_str.count('}'):
-                    # Balanced braces, try to parse
+                    # Balanced braces, try to parse (fixing common JSON issues if needed)
                     try:
-                        parsed_json = json.loads(json_str)
-                        print(f"✅ Successfully parsed JSON: {parsed_json}")
+                        parsed_json = _loads_llm_json(json_str)
+                        logger.debug("✅ Successfully parsed JSON: %s", parsed_json)
                         
                         # Clean the response data
                         cleaned_json = self._clean_response_data(parsed_json)
-                        print(f"🧹 Cleaned JSON: {cleaned_json}")
+                        logger.debug("🧹 Cleaned JSON: %s", cleaned_json)
                         
                         return cleaned_json
                     except json.JSONDecodeError as e:
-                        print(f"❌ JSON decode error: {e}")
+                        logger.warning("❌ JSON decode error: %s", e)
                         # Try to repair the JSON
-                        return self._attempt_json_repair(json_str)
+                        return self._attempt_json_repair(_translate_py_literals(json_str), prompt.key)
                 else:
-                    print(f"❌ Unbalanced braces in JSON")
+                    logger.warning("❌ Unbalanced braces in JSON")
                     return None
             
             # If no braces found, try to parse the whole response
-            print(f"⚠️  No braces found, trying to parse whole response")
-            clean_response = clean_response.replace("'", '"').replace("None", "null").replace("True", "true").replace("False", "false")
-            
+            logger.warning("⚠️  No braces found, trying to parse whole response")
             # Try to extract any JSON-like structure
             try:
-                parsed_json = json.loads(clean_response)
-                print(f"✅ Successfully parsed whole response: {parsed_json}")
+                parsed_json = _loads_llm_json(clean_response)
+                logger.debug("✅ Successfully parsed whole response: %s", parsed_json)
                 
                 # Clean the response data
                 cleaned_json = self._clean_response_data(parsed_json)
-                print(f"🧹 Cleaned JSON: {cleaned_json}")
+                logger.debug("🧹 Cleaned JSON: %s", cleaned_json)
                 
                 return cleaned_json
             except json.JSONDecodeError:
-                print(f"❌ Could not parse as JSON")
-                return self._attempt_json_repair(clean_response)
+                logger.warning("❌ Could not parse as JSON")
+                return self._attempt_json_repair(_translate_py_literals(clean_response), prompt.key)
             
         except Exception as e:
-            print(f"❌ Unexpected error in JSON extraction: {e}")
+            logger.warning("❌ Unexpected error in JSON extraction: %s", e)
             return None
     
-    def _attempt_json_repair(self, text: str) -> Optional[Dict]:
+    def _attempt_json_repair(self, text: str, key: str) -> Optional[Dict]:
         """Attempt to repair malformed JSON"""
         try:
-            print(f"🔧 Attempting to repair JSON: {text[:100]}...")
+            logger.debug("🔧 Attempting to repair JSON: %.100s...", text)
             
             # First, try to extract just the JSON part by looking for the last valid JSON structure
-            import re
-            
-            # Look for JSON patterns with the expected keys
-            json_patterns = [
-                r'\{[^}]*"trending_topics"[^}]*\}',
-                r'\{[^}]*"keyword_gaps"[^}]*\}',
-                r'\{[^}]*"title_suggestions"[^}]*\}',
-                r'\{[^}]*"keyword_clusters"[^}]*\}',
-                r'\{[^}]*"viewer_questions"[^}]*\}',
-                r'\{[^}]*"regional_keywords"[^}]*\}'
-            ]
-            
-            for pattern in json_patterns:
-                matches = re.findall(pattern, text)
+            # with one of the expected keys
+            for pattern in _JSON_PATTERNS:
+                matches = pattern.findall(text)
                 if matches:
                     # Take the last match (most likely to be the actual response)
                     json_str = matches[-1]
-                    print(f"🔧 Found JSON pattern: {json_str}")
+                    logger.debug("🔧 Found JSON pattern: %s", json_str)
                     
                     try:
                         # Try to parse the extracted JSON
-                        json_str = json_str.replace("'", '"').replace("None", "null").replace("True", "true").replace("False", "false")
-                        parsed_json = json.loads(json_str)
-                        print(f"✅ Successfully parsed extracted JSON: {parsed_json}")
+                        parsed_json = _loads_llm_json(json_str)
+                        logger.debug("✅ Successfully parsed extracted JSON: %s", parsed_json)
                         
                         # Clean the response data
                         cleaned_json = self._clean_response_data(parsed_json)
-                        print(f"🧹 Cleaned extracted JSON: {cleaned_json}")
+                        logger.debug("🧹 Cleaned extracted JSON: %s", cleaned_json)
                         
                         return cleaned_json
                     except json.JSONDecodeError:
-                        print(f"❌ Could not parse extracted JSON")
+                        logger.warning("❌ Could not parse extracted JSON")
                         continue
             
             # If no JSON patterns found, try to extract list-like content
-            if '"trending_topics"' in text or '"keyword_gaps"' in text or '"title_suggestions"' in text:
+            if f'"{key}"' in text:
                 # Extract content between quotes as list items
-                quoted_items = re.findall(r'"([^"]*)"', text)
+                quoted_items = _QUOTED_RE.findall(text)
                 
                 if quoted_items:
-                    # Determine the key based on content
-                    repaired_json = None
-                    if 'trending' in text.lower():
-                        repaired_json = {"trending_topics": quoted_items[:5]}
-                    elif 'gap' in text.lower():
-                        repaired_json = {"keyword_gaps": quoted_items[:5]}
-                    elif 'title' in text.lower():
-                        repaired_json = {"title_suggestions": quoted_items[:5]}
-                    elif 'cluster' in text.lower():
-                        repaired_json = {"keyword_clusters": {"series1": quoted_items[:3], "series2": quoted_items[3:6]}}
-                    elif 'question' in text.lower():
-                        repaired_json = {"viewer_questions": quoted_items[:6]}
-                    elif 'regional' in text.lower():
-                        repaired_json = {"regional_keywords": quoted_items[:5]}
-                    
-                    if repaired_json:
-                        # Clean the repaired JSON
-                        cleaned_json = self._clean_response_data(repaired_json)
-                        print(f"🧹 Cleaned repaired JSON: {cleaned_json}")
-                        return cleaned_json
+                    # Clean the repaired JSON
+                    cleaned_json = self._clean_response_data(self._shape_repaired_items(key, quoted_items))
+                    logger.debug("🧹 Cleaned repaired JSON: %s", cleaned_json)
+                    return cleaned_json
             
             # If no structured content found, try to extract any list-like content
             # Look for patterns like: ["item1", "item2", "item3"]
-            list_pattern = r'\[([^\]]*)\]'
-            matches = re.findall(list_pattern, text)
+            matches = _LIST_RE.findall(text)
             
             if matches:
                 # Extract items from the first list found
@@ -581,59 +800,45 @@ class AsyncLLMService:
                 items = [item.strip().strip('"\'') for item in items_str.split(',') if item.strip()]
                 
                 if items:
-                    # Determine the type based on the prompt content
-                    repaired_json = None
-                    if 'trending' in text.lower():
-                        repaired_json = {"trending_topics": items[:5]}
-                    elif 'gap' in text.lower():
-                        repaired_json = {"keyword_gaps": items[:5]}
-                    elif 'title' in text.lower():
-                        repaired_json = {"title_suggestions": items[:5]}
-                    elif 'cluster' in text.lower():
-                        repaired_json = {"keyword_clusters": {"series1": items[:3], "series2": items[3:6]}}
-                    elif 'question' in text.lower():
-                        repaired_json = {"viewer_questions": items[:6]}
-                    elif 'regional' in text.lower():
-                        repaired_json = {"regional_keywords": items[:5]}
-                    
-                    if repaired_json:
-                        # Clean the repaired JSON
-                        cleaned_json = self._clean_response_data(repaired_json)
-                        print(f"🧹 Cleaned repaired JSON: {cleaned_json}")
-                        return cleaned_json
+                    # Clean the repaired JSON
+                    cleaned_json = self._clean_response_data(self._shape_repaired_items(key, items))
+                    logger.debug("🧹 Cleaned repaired JSON: %s", cleaned_json)
+                    return cleaned_json
             
-            print(f"❌ Could not repair JSON from: {text[:100]}...")
+            logger.warning("❌ Could not repair JSON from: %.100s...", text)
             return None
         except Exception as e:
-            print(f"❌ JSON repair error: {e}")
+            logger.warning("❌ JSON repair error: %s", e)
             return None
 
+    @staticmethod
+    def _shape_repaired_items(key: str, items: List[str]) -> Dict:
+        """Arrange salvaged list items into the response shape for key"""
+        if key == "keyword_clusters":
+            return {key: {"series1": items[:3], "series2": items[3:6]}}
+        return {key: items[:6 if key == "viewer_questions" else 5]}
+    
     def _validate_llm_response(self, response: str, expected_key: str) -> bool:
         """Validate if LLM response is relevant to the task"""
+        # Cheap structural checks first; the pattern scan only runs on
+        # responses that look like the JSON we asked for
         # Check if response contains the expected JSON key
         if expected_key not in response:
             return False
         
-        # Check if response contains irrelevant content (more specific patterns)
-        irrelevant_patterns = [
-            "please help me", "pull requests", "improve this code", "will not provide",
-            "i cannot", "i'm sorry", "i don't have", "i am not able",
-            "json object is created", "json endpoint", "json function",
-            "markup", "html", "xml", "javascript", "function"
-        ]
-        
-        response_lower = response.lower()
-        for pattern in irrelevant_patterns:
-            if pattern in response_lower:
-                print(f"❌ Response contains irrelevant content: {pattern}")
-                return False
-        
         # Check if response has proper JSON structure
         if "{" not in response or "}" not in response:
             return False
         
         # Check if response contains the expected key in a JSON-like structure
-        if f'"{expected_key}"' not in response and f"'{expected_key}'" not in response:
+        key_pattern = _KEY_PATTERNS.get(expected_key) or re.compile(rf'["\']{re.escape(expected_key)}["\']\s*:')
+        if not key_pattern.search(response):
+            return False
+        
+        # Check if response contains irrelevant content (more specific patterns)
+        match = _IRRELEVANT_RE.search(response)
+        if match:
+            logger.warning("❌ Response contains irrelevant content: %s", match.group(0).lower())
             return False
         
         return True
@@ -645,107 +850,219 @@ class ChannelStrategyAnalyzer:
     def __init__(self):
         self.llm_service = AsyncLLMService()
         self.prompts = LLMPrompts()
+        # Insights keyed by keyword list, region and language, so channels with
+        # the same keywords share one analysis. Entries expire after an hour
+        # so trending topics are re-asked
+        self._insights_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+    
+    def clear_cache(self) -> int:
+        """Drop all cached insights, returning how many were removed"""
+        removed = len(self._insights_cache)
+        self._insights_cache.clear()
+        return removed
+    
+    @staticmethod
+    def _keyword_signature(keywords: List[str], region: str, language: str) -> tuple:
+        """Case-insensitive key for a keyword list"""
+        # Order matters: the prompts only use the first few keywords
+        return (
+            tuple(keyword.strip().casefold() for keyword in keywords),
+            region.strip().casefold(),
+            language.strip().casefold(),
+        )
     
     async def analyze_channel_strategy(self, channel_id: str, region: str = "global", 
                                      language: str = "en") -> Optional[ChannelStrategyResponse]:
         """Analyze channel strategy using LLM"""
         try:
-            print(f"🎯 Starting channel strategy analysis for {channel_id}")
-            print(f"🌍 Region: {region}, Language: {language}")
+            logger.debug("🎯 Starting channel strategy analysis for %s", channel_id)
+            logger.debug("🌍 Region: %s, Language: %s", region, language)
             
             if not ollama_available:
-                print("⚠️  Ollama not available for strategic analysis")
+                logger.warning("⚠️  Ollama not available for strategic analysis")
                 return None
             
             # Get existing channel data from database
-            print("📊 Getting channel data from database...")
+            logger.debug("📊 Getting channel data from database...")
             channel_data = await self._get_channel_data(channel_id)
             
             # If no channel data exists, create fallback data
-            if not channel_data:
-                print(f"⚠️  No channel data found for {channel_id}, using fallback data")
+            cold_start = not channel_data
+            if cold_start:
+                logger.warning("⚠️  No channel data found for %s, using fallback data", channel_id)
                 channel_data = {
                     "titles": ["general content", "youtube", "content creation"],
                     "total_videos_analyzed": 0,
                     "video_count": 3
                 }
             
-            print(f"✅ Channel data retrieved: {len(str(channel_data))} characters")
+            logger.debug("✅ Channel data retrieved: %s titles", len(channel_data.get("titles", [])))
             
             # Extract keywords from existing analysis
-            print("🔍 Extracting keywords from channel data...")
+            logger.debug("🔍 Extracting keywords from channel data...")
             existing_keywords = self._extract_keywords_from_data(channel_data)
-            print(f"📝 Found {len(existing_keywords)} keywords: {existing_keywords[:5]}")
+            logger.debug("📝 Found %s keywords: %s", len(existing_keywords), existing_keywords[:5])
             
             # Create context for LLM
             context = self._create_channel_context(channel_data, existing_keywords)
-            print(f"📋 Created context: {context}")
-            
-            # Run all strategic analysis sequentially to avoid model conflicts
-            print("🚀 Starting sequential LLM analysis...")
+            logger.debug("📋 Created context: %s", context)
             
             try:
-                trending_topics = await self._analyze_trending_topics(context, region, language)
-                keyword_gaps = await self._analyze_keyword_gaps(existing_keywords, region, language)
-                title_suggestions = await self._analyze_title_suggestions(existing_keywords[:5], region, language)
-                keyword_clusters = await self._analyze_keyword_clusters(existing_keywords)
-                viewer_questions = await self._analyze_viewer_questions(existing_keywords[:8], region, language)
-                regional_keywords = await self._analyze_regional_keywords(existing_keywords[:8], region, language)
-                
-                print(f"✅ LLM analysis completed, processing 6 results")
-                
-                print(f"📊 Results summary:")
-                print(f"  - Trending topics: {len(trending_topics)}")
-                print(f"  - Keyword gaps: {len(keyword_gaps)}")
-                print(f"  - Title suggestions: {len(title_suggestions)}")
-                print(f"  - Keyword clusters: {len(keyword_clusters)}")
-                print(f"  - Viewer questions: {len(viewer_questions)}")
-                print(f"  - Regional keywords: {len(regional_keywords)}")
-                
-                # Create strategic insights
-                print("🏗️  Creating strategic insights object...")
-                strategic_insights = StrategicInsights(
-                    trending_topics=trending_topics,
-                    keyword_gaps=keyword_gaps,
-                    title_suggestions=title_suggestions,
-                    keyword_clusters=keyword_clusters,
-                    viewer_questions=viewer_questions,
-                    regional_keywords=regional_keywords
-                )
+                if cold_start:
+                    strategic_insights = await self.analyze_cold_start(context, region, language)
+                else:
+                    strategic_insights = await self.analyze_channel(context, existing_keywords, region, language)
                 
-                print("🏗️  Creating channel strategy response...")
+                logger.debug("🏗️  Creating channel strategy response...")
                 response = ChannelStrategyResponse(
                     channel_id=channel_id,
-                    analysis_timestamp=str(pd.Timestamp.now()),
+                    analysis_timestamp=str(datetime.now()),
                     region=region,
                     language=language,
                     strategic_insights=strategic_insights
                 )
                 
-                print("✅ Channel strategy analysis completed successfully")
+                logger.debug("✅ Channel strategy analysis completed successfully")
                 return response
                 
             except asyncio.CancelledError:
-                print("❌ Analysis was cancelled")
+                logger.warning("❌ Analysis was cancelled")
                 return None
             except Exception as e:
-                print(f"❌ Analysis error: {e}")
+                logger.warning("❌ Analysis error: %s", e)
                 return None
             
         except asyncio.CancelledError:
-            print("❌ Channel strategy analysis was cancelled")
+            logger.warning("❌ Channel strategy analysis was cancelled")
             return None
         except Exception as e:
-            print(f"💥 Channel strategy analysis error: {e}")
-            print(f"📋 Error type: {type(e).__name__}")
+            logger.error("💥 Channel strategy analysis error: %s", e)
+            logger.error("📋 Error type: %s", type(e).__name__)
             import traceback
-            print(f"🔍 Full traceback: {traceback.format_exc()}")
+            logger.error("🔍 Full traceback: %s", traceback.format_exc())
             return None
     
+    async def analyze_cold_start(self, context: str, region: str, language: str) -> StrategicInsights:
+        """Insights for a channel without stored data, using a single LLM call"""
+        # The keyword-driven analyses would only see placeholder keywords
+        # and produce generic output, so use the static defaults for those
+        insights = {key: _STATIC_FALLBACKS[key][key] for key in EXPECTED_KEYS}
+        system = self.prompts.system_prefix(context, region, language)
+        trending, _ = await self._analyze_trending_topics(system)
+        if trending:
+            insights["trending_topics"] = trending
+        return StrategicInsights(**insights)
+    
+    async def analyze_channel(self, context: str, keywords: List[str], region: str,
+                              language: str) -> StrategicInsights:
+        """Run the strategic analyses and merge them into insights"""
+        if not keywords:
+            return await self.analyze_cold_start(context, region, language)
+        
+        signature = self._keyword_signature(keywords, region, language)
+        cached = self._insights_cache.get(signature)
+        if cached is not None:
+            logger.debug("♻️  Insights cache hit, skipping LLM analysis")
+            return cached
+        
+        joins = precompute_kw_joins(keywords)
+        system = self.prompts.system_prefix(context, region, language)
+        
+        # Ask for everything in one call first; the shared context is only
+        # processed once instead of six times
+        logger.debug("🚀 Starting combined LLM analysis...")
+        insights = await self._analyze_combined(system, joins, len(keywords))
+        
+        # Any key the combined call didn't deliver goes through its own prompt.
+        # These share no data, so fan them out together; with
+        # OLLAMA_NUM_PARALLEL > 1 the server runs them side by side
+        single_analyses = {
+            "trending_topics": lambda: self._analyze_trending_topics(system),
+            "keyword_gaps": lambda: self._analyze_keyword_gaps(system, joins[8]),
+            "title_suggestions": lambda: self._analyze_title_suggestions(system, joins[5]),
+            "keyword_clusters": lambda: self._analyze_keyword_clusters(system, joins[12], len(keywords)),
+            "viewer_questions": lambda: self._analyze_viewer_questions(system, joins[6]),
+            "regional_keywords": lambda: self._analyze_regional_keywords(system, joins[6])
+        }
+        missing = [key for key in EXPECTED_KEYS if key not in insights]
+        # Set when any key holds fallback content instead of an LLM answer;
+        # such insights aren't cached, so the next request asks the LLM again
+        failed = False
+        if missing:
+            logger.debug("🚀 Starting concurrent LLM analysis for %s...", missing)
+            results = await asyncio.gather(*(single_analyses[key]() for key in missing), return_exceptions=True)
+            
+            # Extract results with fallbacks, logging any exceptions
+            for key, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    logger.warning("❌ LLM operation '%s' failed: %s", key, result)
+                    result = ({} if key == "keyword_clusters" else [], False)
+                value, from_llm = result
+                insights[key] = value
+                failed = failed or not from_llm
+        
+        logger.debug("✅ LLM analysis completed")
+        logger.debug("📊 Results summary:")
+        logger.debug("  - Trending topics: %s", len(insights["trending_topics"]))
+        logger.debug("  - Keyword gaps: %s", len(insights["keyword_gaps"]))
+        logger.debug("  - Title suggestions: %s", len(insights["title_suggestions"]))
+        logger.debug("  - Keyword clusters: %s", len(insights["keyword_clusters"]))
+        logger.debug("  - Viewer questions: %s", len(insights["viewer_questions"]))
+        logger.debug("  - Regional keywords: %s", len(insights["regional_keywords"]))
+        
+        # Create strategic insights
+        logger.debug("🏗️  Creating strategic insights object...")
+        result = StrategicInsights(**insights)
+        if not failed:
+            self._insights_cache[signature] = result
+        return result
+    
+    async def _analyze_combined(self, system: str, joins: Dict[int, str], keyword_count: int) -> Dict[str, Any]:
+        """Request all six insight lists in one LLM call, returning the keys that came back usable"""
+        try:
+            prompt = self.prompts.combined_prompt(system, joins)
+            # No retries or fallback: missing keys are retried with their own prompts.
+            # Six lists run to ~700 tokens; a truncated reply would lose every key
+            result = await self.llm_service.generate_structured_response(prompt, max_tokens=900, temperature=0.7,
+                                                                         retries=0, use_fallback=False)
+        except Exception as e:
+            logger.warning("❌ Combined analysis error: %s", e)
+            return {}
+        
+        if not result:
+            return {}
+        
+        insights = {}
+        for key in ("trending_topics", "keyword_gaps", "title_suggestions", "regional_keywords"):
+            if isinstance(result.get(key), list) and result[key]:
+                insights[key] = result[key][:5]
+        
+        if keyword_count < 3:
+            insights["keyword_clusters"] = {}
+        elif isinstance(result.get("keyword_clusters"), dict) and result["keyword_clusters"]:
+            insights["keyword_clusters"] = result["keyword_clusters"]
+        
+        if isinstance(result.get("viewer_questions"), list):
+            questions = self._normalize_questions(result["viewer_questions"])
+            if questions:
+                insights["viewer_questions"] = questions
+        
+        return insights
+    
+    @staticmethod
+    def _normalize_questions(questions: List[str]) -> List[str]:
+        """Keep up to six real questions, ensuring each ends with a question mark"""
+        normalized = []
+        for q in questions[:6]:
+            if q and len(q) > 5:
+                if not q.endswith('?'):
+                    q += '?'
+                normalized.append(q)
+        return normalized
+    
     async def _get_channel_data(self, channel_id: str) -> Optional[Dict]:
         """Get existing channel analysis data from database"""
         try:
-            await db_manager.create_table_if_not_exists()
             data = await db_manager.get_channel_engagement(channel_id, "keyword_analysis")
             
             if data:
@@ -767,13 +1084,20 @@ class ChannelStrategyAnalyzer:
             
             return None
         except Exception as e:
-            print(f"❌ Error getting channel data: {e}")
+            logger.warning("❌ Error getting channel data: %s", e)
             return None
     
     def _extract_keywords_from_data(self, channel_data: Dict) -> List[str]:
         """Extract keywords from stored channel data (optimized for titles only)"""
         if channel_data and 'titles' in channel_data:
-            return channel_data['titles']
+            # Case- and whitespace-insensitive dedupe, keeping the first spelling
+            # and order; duplicates only inflate the prompts
+            unique = {}
+            for title in channel_data['titles']:
+                cleaned = " ".join(str(title).split())
+                if cleaned:
+                    unique.setdefault(cleaned.casefold(), cleaned)
+            return list(unique.values())[:MAX_PROMPT_KEYWORDS]
         return []
     
     def _create_channel_context(self, channel_data: Dict, keywords: List[str]) -> str:
@@ -782,111 +1106,126 @@ class ChannelStrategyAnalyzer:
         top_titles = ', '.join(keywords[:5]) if keywords else 'general content'
         return f"Channel with {video_count} videos covering topics like {top_titles}"
     
-    async def _analyze_trending_topics(self, context: str, region: str, language: str) -> List[str]:
+    # Each _analyze_* helper returns (result, from_llm); from_llm is False when
+    # the result is fallback content or empty because the LLM call failed
+    
+    async def _analyze_trending_topics(self, system: str) -> Tuple[List[str], bool]:
         """Analyze trending topics using LLM"""
         try:
-            prompt = self.prompts.trending_topics_prompt(context, region, language)
+            prompt = self.prompts.trending_topics_prompt(system)
             result = await self.llm_service.generate_structured_response(prompt, max_tokens=150, temperature=0.8)
             
             if result and 'trending_topics' in result:
-                return result['trending_topics'][:5]
+                return result['trending_topics'][:5], not isinstance(result, FallbackResponse)
             
-            print("⚠️  No valid trending topics structure returned from LLM")
-            return []
+            logger.warning("⚠️  No valid trending topics structure returned from LLM")
+            return [], False
             
         except Exception as e:
-            print(f"❌ Trending topics analysis error: {e}")
-            return []
+            logger.warning("❌ Trending topics analysis error: %s", e)
+            return [], False
     
-    async def _analyze_keyword_gaps(self, keywords: List[str], region: str, language: str) -> List[str]:
+    async def _analyze_keyword_gaps(self, system: str, keywords: str) -> Tuple[List[str], bool]:
         """Analyze keyword gaps using LLM"""
+        if not keywords:
+            return [], True
+        
         try:
-            prompt = self.prompts.keyword_gaps_prompt(keywords, region, language)
+            prompt = self.prompts.keyword_gaps_prompt(system, keywords)
             result = await self.llm_service.generate_structured_response(prompt, max_tokens=150, temperature=0.7)
             
             if result and 'keyword_gaps' in result:
-                return result['keyword_gaps'][:5]
+                return result['keyword_gaps'][:5], not isinstance(result, FallbackResponse)
             
-            print("⚠️  No valid keyword gaps structure returned from LLM")
-            return []
+            logger.warning("⚠️  No valid keyword gaps structure returned from LLM")
+            return [], False
             
         except Exception as e:
-            print(f"❌ Keyword gaps analysis error: {e}")
-            return []
+            logger.warning("❌ Keyword gaps analysis error: %s", e)
+            return [], False
     
-    async def _analyze_title_suggestions(self, keywords: List[str], region: str, language: str) -> List[str]:
+    async def _analyze_title_suggestions(self, system: str, keywords: str) -> Tuple[List[str], bool]:
         """Analyze title suggestions using LLM"""
+        if not keywords:
+            return [], True
+        
         try:
-            prompt = self.prompts.title_suggestions_prompt(keywords, region, language)
+            prompt = self.prompts.title_suggestions_prompt(system, keywords)
             result = await self.llm_service.generate_structured_response(prompt, max_tokens=200, temperature=0.9)
             
             if result and 'title_suggestions' in result:
-                return result['title_suggestions'][:5]
+                return result['title_suggestions'][:5], not isinstance(result, FallbackResponse)
             
-            print("⚠️  No valid title suggestions structure returned from LLM")
-            return []
+            logger.warning("⚠️  No valid title suggestions structure returned from LLM")
+            return [], False
             
         except Exception as e:
-            print(f"❌ Title suggestions analysis error: {e}")
-            return []
+            logger.warning("❌ Title suggestions analysis error: %s", e)
+            return [], False
     
-    async def _analyze_keyword_clusters(self, keywords: List[str]) -> Dict[str, List[str]]:
+    async def _analyze_keyword_clusters(self, system: str, keywords: str, keyword_count: int) -> Tuple[Dict[str, List[str]], bool]:
         """Analyze keyword clusters using LLM"""
         try:
-            if not keywords or len(keywords) < 3:
-                return {}
+            if keyword_count < 3:
+                # Too few keywords to cluster; nothing was asked, so nothing failed
+                return {}, True
             
-            prompt = self.prompts.keyword_clusters_prompt(keywords)
-            result = await self.llm_service.generate_structured_response(prompt, max_tokens=180, temperature=0.6)
+            prompt = self.prompts.keyword_clusters_prompt(system, keywords)
+            # Clustering has a local fallback, so a failed call isn't retried
+            result = await self.llm_service.generate_structured_response(prompt, max_tokens=180, temperature=0.6,
+                                                                         retries=0, use_fallback=False)
             
             if result and 'keyword_clusters' in result:
-                return result['keyword_clusters']
+                return result['keyword_clusters'], True
             
-            print("⚠️  No valid keyword clusters structure returned from LLM")
-            return {}
+            logger.warning("⚠️  No valid keyword clusters structure returned from LLM, clustering locally")
+            clusters = _cluster_keywords_locally([kw.strip() for kw in keywords.split(",") if kw.strip()])
+            if clusters:
+                return clusters, False
+            return self.llm_service._generate_fallback_response(prompt).get('keyword_clusters', {}), False
             
         except Exception as e:
-            print(f"❌ Keyword clusters analysis error: {e}")
-            return {}
+            logger.warning("❌ Keyword clusters analysis error: %s", e)
+            return {}, False
     
-    async def _analyze_viewer_questions(self, keywords: List[str], region: str, language: str) -> List[str]:
+    async def _analyze_viewer_questions(self, system: str, keywords: str) -> Tuple[List[str], bool]:
         """Analyze viewer questions using LLM"""
+        if not keywords:
+            return [], True
+        
         try:
-            prompt = self.prompts.viewer_questions_prompt(keywords, region, language)
+            prompt = self.prompts.viewer_questions_prompt(system, keywords)
             result = await self.llm_service.generate_structured_response(prompt, max_tokens=150, temperature=0.7)
             
             if result and 'viewer_questions' in result:
                 # Ensure all questions end with question marks
-                questions = []
-                for q in result['viewer_questions'][:6]:
-                    if q and len(q) > 5:
-                        if not q.endswith('?'):
-                            q += '?'
-                        questions.append(q)
-                return questions
+                return self._normalize_questions(result['viewer_questions']), not isinstance(result, FallbackResponse)
             
-            print("⚠️  No valid viewer questions structure returned from LLM")
-            return []
+            logger.warning("⚠️  No valid viewer questions structure returned from LLM")
+            return [], False
             
         except Exception as e:
-            print(f"❌ Viewer questions analysis error: {e}")
-            return []
+            logger.warning("❌ Viewer questions analysis error: %s", e)
+            return [], False
     
-    async def _analyze_regional_keywords(self, keywords: List[str], region: str, language: str) -> List[str]:
+    async def _analyze_regional_keywords(self, system: str, keywords: str) -> Tuple[List[str], bool]:
         """Analyze regional keywords using LLM"""
+        if not keywords:
+            return [], True
+        
         try:
-            prompt = self.prompts.regional_keywords_prompt(keywords, region, language)
+            prompt = self.prompts.regional_keywords_prompt(system, keywords)
             result = await self.llm_service.generate_structured_response(prompt, max_tokens=120, temperature=0.8)
             
             if result and 'regional_keywords' in result:
-                return result['regional_keywords'][:5]
+                return result['regional_keywords'][:5], not isinstance(result, FallbackResponse)
             
-            print("⚠️  No valid regional keywords structure returned from LLM")
-            return []
+            logger.warning("⚠️  No valid regional keywords structure returned from LLM")
+            return [], False
             
         except Exception as e:
-            print(f"❌ Regional keywords analysis error: {e}")
-            return []
+            logger.warning("❌ Regional keywords analysis error: %s", e)
+            return [], False
 
 
 # Initialize analyzer
@@ -894,7 +1233,7 @@ analyzer = ChannelStrategyAnalyzer()
 
 # API Endpoints
 @app.post("/analyze-channel-strategy", response_model=ChannelStrategyResponse)
-async def analyze_channel_strategy(request: ChannelStrategyRequest):
+async def analyze_channel_strategy(request: ChannelStrategyRequest, background_tasks: BackgroundTasks):
     """
     Analyze channel strategy and provide comprehensive strategic recommendations
     
@@ -910,8 +1249,8 @@ async def analyze_channel_strategy(request: ChannelStrategyRequest):
         * Regional/language-specific keywords
     """
     try:
-        logger.info(f"🎯 Starting channel strategy analysis for {request.channel_id}")
-        logger.info(f"🌍 Region: {request.region}, Language: {request.language}")
+        logger.debug("🎯 Starting channel strategy analysis for %s", request.channel_id)
+        logger.debug("🌍 Region: %s, Language: %s", request.region, request.language)
         
         result = await analyzer.analyze_channel_strategy(
             request.channel_id,
@@ -919,30 +1258,32 @@ async def analyze_channel_strategy(request: ChannelStrategyRequest):
             request.language
         )
         
-        logger.info(f"📊 Analysis result type: {type(result)}")
-        logger.info(f"📊 Analysis result: {result is not None}")
+        logger.debug("📊 Analysis result type: %s", type(result))
+        logger.debug("📊 Analysis result: %s", result is not None)
         
         if result:
-            logger.info("💾 Saving analysis results to database...")
-            # Save analysis results to database
-            save_success = await db_manager.save_channel_engagement(
+            logger.debug("💾 Scheduling analysis results save...")
+            # Save analysis results to database after the response is sent; the
+            # client doesn't wait on it. pydantic serializes straight to JSON
+            # without building an intermediate dict
+            background_tasks.add_task(
+                db_manager.save_channel_engagement,
                 request.channel_id,
                 "channel_strategy",
-                result.dict()
+                result.model_dump_json().encode()
             )
-            logger.info(f"💾 Save success: {save_success}")
             
-            logger.info(f"✅ Channel strategy analysis completed for {request.channel_id}")
+            logger.info("✅ Channel strategy analysis completed for %s", request.channel_id)
             return result
         else:
             logger.error("❌ Analysis returned None")
             raise HTTPException(status_code=500, detail="Channel strategy analysis failed")
     
     except Exception as e:
-        logger.error(f"💥 Analysis error: {e}")
-        logger.error(f"📋 Error type: {type(e).__name__}")
+        logger.error("💥 Analysis error: %s", e)
+        logger.error("📋 Error type: %s", type(e).__name__)
         import traceback
-        logger.error(f"🔍 Full traceback: {traceback.format_exc()}")
+        logger.error("🔍 Full traceback: %s", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 @app.get("/channel-engagement/{channel_id}/{engagement_type}", response_model=ChannelEngagementResponse)
@@ -951,7 +1292,6 @@ async def get_channel_engagement(channel_id: str, engagement_type: str):
     Retrieve channel engagement data by channel_id and engagement_type
     """
     try:
-        await db_manager.create_table_if_not_exists()
         data = await db_manager.get_channel_engagement(channel_id, engagement_type)
         
         return ChannelEngagementResponse(
@@ -970,12 +1310,11 @@ async def save_channel_engagement(engagement_data: ChannelEngagementSave):
     Save or update channel engagement data
     """
     try:
-        logger.info(f"🔧 Attempting to save engagement data for channel: {engagement_data.channel_id}")
-        logger.info(f"📊 Engagement type: {engagement_data.engagement_type}")
-        logger.info(f"📝 Data size: {len(str(engagement_data.data))} characters")
-        
-        await db_manager.create_table_if_not_exists()
-        logger.info("✅ Table creation/check completed")
+        logger.debug("🔧 Attempting to save engagement data for channel: %s", engagement_data.channel_id)
+        logger.debug("📊 Engagement type: %s", engagement_data.engagement_type)
+        if logger.isEnabledFor(logging.DEBUG):
+            # Only serialize the payload for its size when someone will see it
+            logger.debug("📝 Data size: %s bytes", len(orjson.dumps(engagement_data.data)))
         
         success = await db_manager.save_channel_engagement(
             engagement_data.channel_id,
@@ -983,7 +1322,7 @@ async def save_channel_engagement(engagement_data: ChannelEngagementSave):
             engagement_data.data
         )
         
-        logger.info(f"💾 Database save result: {success}")
+        logger.debug("💾 Database save result: %s", success)
         
         if success:
             return {
@@ -996,10 +1335,10 @@ async def save_channel_engagement(engagement_data: ChannelEngagementSave):
             raise HTTPException(status_code=500, detail="Failed to save data")
     
     except Exception as e:
-        logger.error(f"💥 Save engagement error: {e}")
-        logger.error(f"📋 Error type: {type(e).__name__}")
+        logger.error("💥 Save engagement error: %s", e)
+        logger.error("📋 Error type: %s", type(e).__name__)
         import traceback
-        logger.error(f"🔍 Full traceback: {traceback.format_exc()}")
+        logger.error("🔍 Full traceback: %s", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Database save failed: {str(e)}")
 
 @app.post("/analyze-keywords", response_model=ChannelStrategyResponse)
@@ -1014,92 +1353,90 @@ async def analyze_keywords(request: KeywordAnalysisRequest):
     3. Provides comprehensive recommendations based on provided keywords
     """
     try:
-        print(f"🎯 Starting keyword analysis for {request.channel_id}")
-        print(f"🔍 Keywords provided: {request.keywords}")
-        print(f"🌍 Region: {request.region}, Language: {request.language}")
+        logger.debug("🎯 Starting keyword analysis for %s", request.channel_id)
+        logger.debug("🔍 Keywords provided: %s", request.keywords)
+        logger.debug("🌍 Region: %s, Language: %s", request.region, request.language)
         
         if not ollama_available:
-            print("⚠️  Ollama not available for keyword analysis")
+            logger.warning("⚠️  Ollama not available for keyword analysis")
             raise HTTPException(status_code=500, detail="LLM model not available")
         
         if not request.keywords:
             raise HTTPException(status_code=400, detail="At least one keyword is required")
         
-        # Create context from provided keywords
-        context = f"Channel covering topics like {', '.join(request.keywords[:5])}"
-        print(f"📋 Created context: {context}")
-        
-        # Run all strategic analysis concurrently using provided keywords
-        print("🚀 Starting concurrent LLM analysis with provided keywords...")
-        results = await asyncio.gather(
-            analyzer._analyze_trending_topics(context, request.region, request.language),
-            analyzer._analyze_keyword_gaps(request.keywords, request.region, request.language),
-            analyzer._analyze_title_suggestions(request.keywords[:5], request.region, request.language),
-            analyzer._analyze_keyword_clusters(request.keywords),
-            analyzer._analyze_viewer_questions(request.keywords[:8], request.region, request.language),
-            analyzer._analyze_regional_keywords(request.keywords[:8], request.region, request.language),
-            return_exceptions=True
-        )
-        
-        print(f"✅ LLM analysis completed, processing {len(results)} results")
+        response = await _analyze_keyword_set(request.channel_id, request.keywords, request.region, request.language)
         
-        # Extract results with fallbacks
-        trending_topics = results[0] if not isinstance(results[0], Exception) else []
-        keyword_gaps = results[1] if not isinstance(results[1], Exception) else []
-        title_suggestions = results[2] if not isinstance(results[2], Exception) else []
-        keyword_clusters = results[3] if not isinstance(results[3], Exception) else {}
-        viewer_questions = results[4] if not isinstance(results[4], Exception) else []
-        regional_keywords = results[5] if not isinstance(results[5], Exception) else []
+        logger.debug("✅ Keyword analysis completed successfully")
+        return response
         
-        print(f"📊 Results summary:")
-        print(f"  - Trending topics: {len(trending_topics)}")
-        print(f"  - Keyword gaps: {len(keyword_gaps)}")
-        print(f"  - Title suggestions: {len(title_suggestions)}")
-        print(f"  - Keyword clusters: {len(keyword_clusters)}")
-        print(f"  - Viewer questions: {len(viewer_questions)}")
-        print(f"  - Regional keywords: {len(regional_keywords)}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("💥 Keyword analysis error: %s", e)
+        logger.error("📋 Error type: %s", type(e).__name__)
+        import traceback
+        logger.error("🔍 Full traceback: %s", traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Keyword analysis failed: {str(e)}")
+
+@app.post("/analyze-keywords-batch", response_model=KeywordBatchAnalysisResponse)
+async def analyze_keywords_batch(request: KeywordBatchAnalysisRequest):
+    """
+    Analyze several keyword sets for one channel in a single request
+    
+    Each set gets the same analysis as /analyze-keywords; the sets run
+    concurrently, bounded by the LLM service's Ollama slots.
+    """
+    try:
+        logger.debug("🎯 Starting batch keyword analysis for %s (%d sets)", request.channel_id, len(request.batches))
         
-        # Log any exceptions
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                operation_names = ["trending_topics", "keyword_gaps", "title_suggestions", 
-                                 "keyword_clusters", "viewer_questions", "regional_keywords"]
-                print(f"❌ LLM operation '{operation_names[i]}' failed: {result}")
+        if not ollama_available:
+            logger.warning("⚠️  Ollama not available for keyword analysis")
+            raise HTTPException(status_code=500, detail="LLM model not available")
         
-        # Create strategic insights
-        print("🏗️  Creating strategic insights object...")
-        strategic_insights = StrategicInsights(
-            trending_topics=trending_topics,
-            keyword_gaps=keyword_gaps,
-            title_suggestions=title_suggestions,
-            keyword_clusters=keyword_clusters,
-            viewer_questions=viewer_questions,
-            regional_keywords=regional_keywords
-        )
+        if not request.batches:
+            raise HTTPException(status_code=400, detail="At least one keyword set is required")
+        if len(request.batches) > MAX_KEYWORD_BATCHES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_KEYWORD_BATCHES} keyword sets are allowed per request")
+        if not all(batch.keywords for batch in request.batches):
+            raise HTTPException(status_code=400, detail="At least one keyword is required in every set")
         
-        print("🏗️  Creating channel strategy response...")
-        response = ChannelStrategyResponse(
-            channel_id=request.channel_id,
-            analysis_timestamp=str(pd.Timestamp.now()),
-            region=request.region,
-            language=request.language,
-            strategic_insights=strategic_insights
-        )
+        results = await asyncio.gather(*(
+            _analyze_keyword_set(request.channel_id, batch.keywords, batch.region, batch.language)
+            for batch in request.batches
+        ))
         
-        print("✅ Keyword analysis completed successfully")
-        return response
+        logger.debug("✅ Batch keyword analysis completed successfully")
+        return KeywordBatchAnalysisResponse(results=results)
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"💥 Keyword analysis error: {e}")
-        print(f"📋 Error type: {type(e).__name__}")
+        logger.error("💥 Batch keyword analysis error: %s", e)
+        logger.error("📋 Error type: %s", type(e).__name__)
         import traceback
-        print(f"🔍 Full traceback: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Keyword analysis failed: {str(e)}")
+        logger.error("🔍 Full traceback: %s", traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Batch keyword analysis failed: {str(e)}")
+
+async def _analyze_keyword_set(channel_id: str, keywords: List[str], region: str, language: str) -> ChannelStrategyResponse:
+    """Run the strategic analysis for one keyword set"""
+    # Create context from provided keywords
+    context = f"Channel covering topics like {', '.join(keywords[:5])}"
+    logger.debug("📋 Created context: %s", context)
+    
+    # Run all strategic analysis concurrently using provided keywords
+    strategic_insights = await analyzer.analyze_channel(context, keywords, region, language)
+    
+    logger.debug("🏗️  Creating channel strategy response...")
+    return ChannelStrategyResponse(
+        channel_id=channel_id,
+        analysis_timestamp=str(datetime.now()),
+        region=region,
+        language=language,
+        strategic_insights=strategic_insights
+    )
 
 @app.get("/")
-async def root():
+async def root() -> Dict[str, Any]:
     """Root endpoint with API information"""
     return {
         "message": "YouTube Channel Strategy Analyzer API",
@@ -1108,22 +1445,41 @@ async def root():
         "endpoints": {
             "POST /analyze-channel-strategy": "Main channel strategy analysis (uses stored data)",
             "POST /analyze-keywords": "Direct keyword analysis (accepts keywords as input)",
+            "POST /analyze-keywords-batch": "Direct keyword analysis for several keyword sets in one request",
             "GET /channel-engagement/{channel_id}/{engagement_type}": "Retrieve stored data",
             "POST /channel-engagement": "Save analysis data",
-            "GET /health": "Health check"
+            "GET /debug/llm-cache": "LLM response cache statistics",
+            "POST /cache/clear": "Clear the LLM response and insights caches",
+            "GET /health": "Health check",
+            "HEAD /health": "Liveness probe (no body)"
         }
     }
 
+@app.get("/debug/llm-cache")
+async def llm_cache_stats() -> Dict[str, int]:
+    """Report LLM response cache statistics"""
+    return analyzer.llm_service.cache_stats()
+
+@app.post("/cache/clear")
+async def clear_llm_cache() -> Dict[str, int]:
+    """Clear the LLM response and insights caches"""
+    return {
+        "cleared": analyzer.llm_service.clear_cache(),
+        "insights_cleared": analyzer.clear_cache()
+    }
+
+@app.head("/health")
+async def health_probe() -> Response:
+    """Liveness probe: answers as soon as the API is up, without the database and Ollama checks"""
+    return Response(status_code=200)
+
 @app.get("/health")
-async def health_check():
+async def health_check() -> Dict[str, Any]:
     """Health check endpoint"""
     try:
         # Check database connection
-        db_status = "connected"
-        try:
-            await db_manager.create_table_if_not_exists()
-        except Exception as e:
-            db_status = f"error: {str(e)}"
+        # The schema is created at startup, so only check that the database answers
+        db_status = "connected" if await db_manager.ping() else "error: database unreachable"
         
         # Check Ollama connection
         ollama_status = "available" if ollama_available else "unavailable"
@@ -1144,13 +1500,12 @@ async def health_check():
         }
 
 @app.options("/{path:path}")
-async def options_handler(path: str):
+async def options_handler(path: str) -> Dict[str, str]:
     """Handle OPTIONS requests for CORS preflight"""
     return {"message": "OK"}
 
 if __name__ == "__main__":
     import signal
-    import sys
     
     def signal_handler(sig, frame):
         print("\n🛑 Received interrupt signal, shutting down gracefully...")
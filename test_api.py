@@ -1,5 +1,7 @@
 import requests
-import json
+import orjson
+import sys
+from _http import JSON_HEADERS, LLM_TIMEOUT, SESSION, TIMEOUT
 
 # Test data - sample YouTube channel metadata
 sample_data = {
@@ -29,6 +31,14 @@ sample_data = {
     "channel_id": "UC_tech_education_test"  # Added for AI features testing
 }
 
+# The request body never changes, so encode it once
+SAMPLE_BODY = orjson.dumps(sample_data)
+
+# Polarity beyond +/-MOOD_THRESHOLD reads as positive/negative, anything
+# within it (inclusive) as neutral
+MOOD_THRESHOLD = 0.1
+MOOD_LABELS = ("Negative 😔", "Neutral 😐", "Positive 😊")
+
 def test_api():
     """Test the keyword analysis API"""
     
@@ -42,10 +52,10 @@ def test_api():
         print()
         
         # Make POST request
-        response = requests.post(url, json=sample_data)
+        response = SESSION.post(url, data=SAMPLE_BODY, headers=JSON_HEADERS, timeout=LLM_TIMEOUT)
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             
             print("✅ API Response Success!")
             print("=" * 50)
@@ -55,33 +65,32 @@ def test_api():
             print(f"📺 Videos analyzed: {result['total_videos_analyzed']}")
             print()
             
+            # Each section is built as one string and written once
             # Display top keywords
-            print("🔥 TOP KEYWORDS:")
-            for i, kw in enumerate(result['top_keywords'][:10], 1):
-                print(f"  {i:2}. {kw.keyword} (appears {kw.frequency} times)")
-            print()
+            lines = ["🔥 TOP KEYWORDS:"]
+            lines += [f"  {i:2}. {kw['keyword']} (appears {kw['frequency']} times)"
+                      for i, kw in enumerate(result['top_keywords'][:10], 1)]
+            sys.stdout.write("\n".join(lines) + "\n\n")
             
             # Keyword categories
-            print("📂 KEYWORD CATEGORIES:")
+            lines = ["📂 KEYWORD CATEGORIES:"]
             for category, keywords in result['keyword_categories'].items():
-                print(f"  {category.upper()}: {', '.join(keywords[:5])}")
+                lines.append(f"  {category.upper()}: {', '.join(keywords[:5])}")
                 if len(keywords) > 5:
-                    print(f"    ... and {len(keywords) - 5} more")
-            print()
+                    lines.append(f"    ... and {len(keywords) - 5} more")
+            sys.stdout.write("\n".join(lines) + "\n\n")
             
             # AI-generated suggestions (if available)
             if result.get('ai_generated_suggestions'):
-                print("🤖 AI-GENERATED KEYWORD SUGGESTIONS:")
-                for i, suggestion in enumerate(result['ai_generated_suggestions'][:5], 1):
-                    print(f"  {i}. {suggestion}")
-                print()
+                lines = ["🤖 AI-GENERATED KEYWORD SUGGESTIONS:"]
+                lines += [f"  {i}. {suggestion}" for i, suggestion in enumerate(result['ai_generated_suggestions'][:5], 1)]
+                sys.stdout.write("\n".join(lines) + "\n\n")
             
             # AI-generated content ideas (if available)
             if result.get('content_ideas'):
-                print("💭 AI-GENERATED CONTENT IDEAS:")
-                for i, idea in enumerate(result['content_ideas'][:3], 1):
-                    print(f"  {i}. {idea}")
-                print()
+                lines = ["💭 AI-GENERATED CONTENT IDEAS:"]
+                lines += [f"  {i}. {idea}" for i, idea in enumerate(result['content_ideas'][:3], 1)]
+                sys.stdout.write("\n".join(lines) + "\n\n")
             
             # Sentiment analysis
             print("😊 SENTIMENT ANALYSIS:")
@@ -89,22 +98,18 @@ def test_api():
             polarity = sentiment['polarity']
             subjectivity = sentiment['subjectivity']
             
-            if polarity > 0.1:
-                mood = "Positive 😊"
-            elif polarity < -0.1:
-                mood = "Negative 😔"
-            else:
-                mood = "Neutral 😐"
-                
-            print(f"  Overall mood: {mood}")
-            print(f"  Polarity: {polarity} (-1=negative, +1=positive)")
-            print(f"  Subjectivity: {subjectivity} (0=objective, 1=subjective)")
-            print()
+            mood = MOOD_LABELS[(polarity > MOOD_THRESHOLD) - (polarity < -MOOD_THRESHOLD) + 1]
+            
+            sys.stdout.write(
+                f"  Overall mood: {mood}\n"
+                f"  Polarity: {polarity} (-1=negative, +1=positive)\n"
+                f"  Subjectivity: {subjectivity} (0=objective, 1=subjective)\n\n"
+            )
             
             # Recommendations
-            print("💡 SEO RECOMMENDATIONS:")
-            for i, rec in enumerate(result['recommendations'], 1):
-                print(f"  {i}. {rec}")
+            lines = ["💡 SEO RECOMMENDATIONS:"]
+            lines += [f"  {i}. {rec}" for i, rec in enumerate(result['recommendations'], 1)]
+            sys.stdout.write("\n".join(lines) + "\n")
             
         else:
             print(f"❌ API Error: {response.status_code}")
@@ -119,9 +124,9 @@ def test_api():
 def test_health_check():
     """Test the health check endpoint"""
     try:
-        response = requests.get("http://localhost:8000/health")
+        response = SESSION.get("http://localhost:8000/health", timeout=TIMEOUT)
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print(f"✅ API Health Check: {result['status']}")
             print(f"📍 Service: {result['service']} v{result['version']}")
             print(f"🗄️  Database: {result.get('database_status', 'unknown')}")
@@ -136,14 +141,15 @@ def test_health_check():
         return False
 
 if __name__ == "__main__":
-    print("🧪 Keyword Intelligence Assistant - API Test")
-    print("=" * 50)
-    
-    # Test health check first
-    if test_health_check():
-        print()
-        # Test main functionality
-        test_api()
-    else:
-        print("💡 Make sure to start the API server first:")
-        print("   python main.py") 
\ No newline at end of file
+    with SESSION:
+        print("🧪 Keyword Intelligence Assistant - API Test")
+        print("=" * 50)
+        
+        # Test health check first
+        if test_health_check():
+            print()
+            # Test main functionality
+            test_api()
+        else:
+            print("💡 Make sure to start the API server first:")
+            print("   python main.py") 
\ No newline at end of file
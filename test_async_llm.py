@@ -3,17 +3,191 @@ Test Async LLM Service - Check if the async implementation works
 """
 
 import asyncio
+import functools
+import os
 import time
-from transformers import pipeline
-from concurrent.futures import ThreadPoolExecutor
+import httpx
+
+# uvloop's libuv event loop schedules the many small HTTP tasks more cheaply;
+# fall back to the stdlib loop where it isn't installed (e.g. on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Point at a running llm_worker.py to send generations over HTTP to its warm
+# model instead of loading one in this process
+LLM_WORKER_URL = os.getenv("LLM_WORKER_URL")
+MODEL_ID = "openai-community/gpt2"
+# Concurrent generations Test 3 keeps in flight; matches the batch size so
+# a full window fills one local batch
+MAX_INFLIGHT = 8
 
 class AsyncLLMService:
     """Async service for LLM operations with error handling"""
     
     def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=2)
         self.max_retries = 2
         self.timeout = 30
+        # In-process model, loaded once on first local generation. Local
+        # prompts are queued and generated in padded batches, so concurrent
+        # calls share forward passes instead of running one after another
+        self.tokenizer = None
+        self.model = None
+        self.max_batch_size = 8
+        self.max_wait_ms = 20
+        # Prompts within this many tokens of each other share a batch, so
+        # padding stays small when short and long prompts arrive together
+        self.bucket_width = 8
+        # Token ids per prompt, so repeated prompts (and the bucketing pass
+        # before each generate) don't tokenize the same text again
+        self._tokenize = functools.lru_cache(maxsize=512)(self._encode_prompt)
+        # Length groups of one batch generate side by side in worker threads,
+        # each with a single torch thread so they don't oversubscribe the CPU
+        self.max_concurrent_batches = max(1, min((os.cpu_count() or 1) // 2, 4))
+        self._batch_semaphore = None
+        self._queue = None
+        self._worker_task = None
+        # One pooled client shared by every call, including concurrent ones
+        self.client = None
+        if LLM_WORKER_URL:
+            self.client = httpx.AsyncClient(
+                base_url=LLM_WORKER_URL,
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+    
+    async def aclose(self):
+        """Close the worker client and stop the batch worker, if any"""
+        if self.client is not None:
+            await self.client.aclose()
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+    
+    async def _generate_remote(self, prompt: str, max_tokens: int) -> list:
+        """Run one generation on the llm_worker.py model"""
+        response = await self.client.post(
+            "/generate",
+            json={"prompt": prompt, "max_new_tokens": max_tokens},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return [response.json()]
+    
+    def _load_model(self):
+        """Load the GPT-2 tokenizer and model on first use and reuse them for every later batch"""
+        # Only the batch worker calls this, one batch at a time
+        if self.model is None:
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+            torch.set_num_threads(1)
+            torch.set_num_interop_threads(1)
+            tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+            # GPT-2 has no pad token; left padding keeps each prompt's last
+            # token next to the text generated for it
+            tokenizer.pad_token = tokenizer.eos_token
+            tokenizer.padding_side = "left"
+            self.tokenizer = tokenizer
+            self.model = AutoModelForCausalLM.from_pretrained(MODEL_ID).to("cpu").eval()
+        return self.tokenizer, self.model
+    
+    def _encode_prompt(self, prompt: str) -> tuple:
+        """Token ids of one prompt, truncated to the model's context"""
+        tokenizer, _ = self._load_model()
+        return tuple(tokenizer(prompt, truncation=True)["input_ids"])
+    
+    def _generate_batch(self, prompts: list, max_tokens: int, temperature: float) -> list:
+        """Generate for several prompts in one padded model.generate call"""
+        import torch
+        tokenizer, model = self._load_model()
+        encoded = tokenizer.pad(
+            [{"input_ids": list(self._tokenize(prompt))} for prompt in prompts],
+            padding=True,
+            return_tensors="pt",
+        )
+        with torch.inference_mode():
+            output = model.generate(
+                **encoded,
+                max_new_tokens=max_tokens,
+                do_sample=True,
+                temperature=temperature,
+                pad_token_id=tokenizer.eos_token_id
+            )
+        # Like the pipeline's generated_text: prompt followed by its continuation
+        return tokenizer.batch_decode(output, skip_special_tokens=True)
+    
+    def _length_buckets(self, prompts: list) -> list:
+        """Token-length bucket of each prompt"""
+        return [len(self._tokenize(prompt)) // self.bucket_width for prompt in prompts]
+    
+    async def _batch_worker(self):
+        """Collect queued prompts into batches and run each batch off the event loop"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # Give concurrent callers a moment to join this batch
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                buckets = await asyncio.to_thread(self._length_buckets, [item[0] for item in batch])
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            # One generate call per (max_tokens, temperature, length bucket),
+            # each padded only to its own longest prompt
+            groups = {}
+            for (prompt, max_tokens, temperature, future), bucket in zip(batch, buckets):
+                groups.setdefault((max_tokens, temperature, bucket), []).append((prompt, future))
+            
+            await asyncio.gather(*[
+                self._run_group(items, max_tokens, temperature)
+                for (max_tokens, temperature, _), items in groups.items()
+            ])
+    
+    async def _run_group(self, items: list, max_tokens: int, temperature: float):
+        """Generate one length group off the event loop and resolve its futures"""
+        prompts = [prompt for prompt, _ in items]
+        try:
+            async with self._batch_semaphore:
+                texts = await asyncio.to_thread(self._generate_batch, prompts, max_tokens, temperature)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), text in zip(items, texts):
+            # Callers that timed out have already cancelled their future
+            if not future.done():
+                future.set_result([{"generated_text": text}])
+    
+    async def _generate_local(self, prompt: str, max_tokens: int, temperature: float) -> list:
+        """Queue one generation for the in-process model's next batch"""
+        if self._worker_task is None:
+            self._queue = asyncio.Queue()
+            self._batch_semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker_task = asyncio.create_task(self._batch_worker())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((prompt, max_tokens, temperature, future))
+        
+        # Execute with timeout
+        return await asyncio.wait_for(future, timeout=self.timeout)
     
     async def generate_text_async(self, prompt: str, max_tokens: int = 100, temperature: float = 0.7) -> str:
         """Async wrapper for text generation with error handling"""
@@ -21,26 +195,10 @@ class AsyncLLMService:
             print(f"🔍 Generating text with {max_tokens} tokens...")
             print(f"📝 Prompt: {prompt[:50]}...")
             
-            # Run the synchronous text generation in a thread pool
-            loop = asyncio.get_event_loop()
-            
-            def generate_text():
-                text_generator = pipeline("text-generation", model="openai-community/gpt2", device="cpu")
-                return text_generator(
-                    prompt,
-                    max_new_tokens=max_tokens,
-                    num_return_sequences=1,
-                    temperature=temperature,
-                    do_sample=True,
-                    pad_token_id=50256,
-                    truncation=True
-                )
-            
-            # Execute with timeout
-            result = await asyncio.wait_for(
-                loop.run_in_executor(self.executor, generate_text),
-                timeout=self.timeout
-            )
+            if self.client is not None:
+                result = await self._generate_remote(prompt, max_tokens)
+            else:
+                result = await self._generate_local(prompt, max_tokens, temperature)
             
             if result and len(result) > 0:
                 generated_text = result[0]['generated_text']
@@ -48,19 +206,38 @@ class AsyncLLMService:
                 return generated_text
             return None
             
-        except asyncio.TimeoutError:
+        except (asyncio.TimeoutError, httpx.TimeoutException):
             print(f"❌ LLM generation timed out after {self.timeout}s")
             return None
         except Exception as e:
             print(f"❌ LLM generation error: {e}")
             return None
 
+# One service for every test in the run, so the model loads only once
+_SERVICE = None
+
+def get_service() -> AsyncLLMService:
+    """Shared AsyncLLMService, created on first use"""
+    global _SERVICE
+    if _SERVICE is None:
+        _SERVICE = AsyncLLMService()
+    return _SERVICE
+
+async def close_service():
+    """Close the shared service, if one was created"""
+    global _SERVICE
+    if _SERVICE is not None:
+        await _SERVICE.aclose()
+        _SERVICE = None
+
 async def test_async_llm():
     """Test the async LLM service"""
     print("🧪 Testing Async LLM Service...")
     
-    llm_service = AsyncLLMService()
-    
+    return await _run_llm_tests(get_service())
+
+async def _run_llm_tests(llm_service):
+    """Tests 1-3, sharing one service"""
     # Test 1: Simple prompt
     print("\n🔍 Test 1: Simple Prompt")
     prompt1 = "Generate a list of 3 topics:"
@@ -100,10 +277,18 @@ Required format:
     ]
     
     start_time = time.time()
-    results = await asyncio.gather(*[
-        llm_service.generate_text_async(prompt, max_tokens=30) 
-        for prompt in prompts
-    ])
+    # Sliding window: submit a new prompt whenever one finishes, so long
+    # prompt lists never have more than MAX_INFLIGHT generations pending
+    results = []
+    pending = set()
+    for prompt in prompts:
+        if len(pending) >= MAX_INFLIGHT:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            results.extend(task.result() for task in done)
+        pending.add(asyncio.create_task(llm_service.generate_text_async(prompt, max_tokens=30)))
+    if pending:
+        done, _ = await asyncio.wait(pending)
+        results.extend(task.result() for task in done)
     end_time = time.time()
     
     successful_results = [r for r in results if r]
@@ -116,7 +301,10 @@ async def main():
     print("🧪 Async LLM Service Test")
     print("=" * 50)
     
-    success = await test_async_llm()
+    try:
+        success = await test_async_llm()
+    finally:
+        await close_service()
     
     if success:
         print("\n🎉 All async LLM tests passed!")
@@ -124,4 +312,7 @@ async def main():
         print("\n❌ Some async LLM tests failed!")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    if UVLOOP_AVAILABLE:
+        uvloop.run(main())
+    else:
+        asyncio.run(main()) 
\ No newline at end of file
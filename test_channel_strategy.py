@@ -3,19 +3,54 @@ Test script for Channel Strategy Analysis API
 Tests the consolidated channel strategy analysis endpoint
 """
 
+import sys
 import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from _http import JSON_HEADERS, LLM_TIMEOUT, SESSION, TIMEOUT
 
 BASE_URL = "http://localhost:8000"
 
+TEST_CHANNEL_ID = "UCKWaEZ-_VweaEx1j62do_vQ"
+
+# Channels analyzed concurrently by main(); just the pre-populated test
+# channel by default
+CHANNEL_IDS = [TEST_CHANNEL_ID]
+
+# Strategy request per channel, encoded once
+STRATEGY_BODIES = {
+    channel_id: orjson.dumps({
+        "channel_id": channel_id,
+        "region": "global",
+        "language": "en"
+    })
+    for channel_id in CHANNEL_IDS
+}
+
+# Minimal keyword analysis saved for the test channel, encoded once
+PREPOPULATE_BODY = orjson.dumps({
+    "channel_id": TEST_CHANNEL_ID,
+    "engagement_type": "keyword_analysis",
+    "data": {
+        "top_keywords": [
+            {"keyword": "Block Chain", "frequency": 5},
+            {"keyword": "crypto", "frequency": 2}
+        ],
+        "keyword_categories": {"technology": ["Block Chain", "crypto"]},
+        "sentiment_analysis": {"positive": 0.8, "negative": 0.1, "neutral": 0.1},
+        "total_videos_analyzed": 1,
+        "recommendations": ["Focus on Block Chain content"]
+    }
+})
+
 def test_health_check():
     """Test health check endpoint"""
     print("🏥 Testing Health Check...")
     
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = SESSION.get(f"{BASE_URL}/health", timeout=TIMEOUT)
         if response.status_code == 200:
-            health = response.json()
+            health = orjson.loads(response.content)
             print(f"  ✅ API Status: {health['status']}")
             print(f"  🗄️  Database: {health['database_status']}")
             print(f"  🤖 GPT-2 Model: {health['gpt2_model_status']}")
@@ -31,24 +66,8 @@ def test_health_check():
 def prepopulate_channel_keyword_analysis():
     """Pre-populate the database with minimal keyword analysis for the test channel."""
     print("\n🔧 Pre-populating channel keyword analysis...")
-    channel_id = "UCKWaEZ-_VweaEx1j62do_vQ"
-    data = {
-        "top_keywords": [
-            {"keyword": "Block Chain", "frequency": 5},
-            {"keyword": "crypto", "frequency": 2}
-        ],
-        "keyword_categories": {"technology": ["Block Chain", "crypto"]},
-        "sentiment_analysis": {"positive": 0.8, "negative": 0.1, "neutral": 0.1},
-        "total_videos_analyzed": 1,
-        "recommendations": ["Focus on Block Chain content"]
-    }
-    payload = {
-        "channel_id": channel_id,
-        "engagement_type": "keyword_analysis",
-        "data": data
-    }
     try:
-        response = requests.post(f"{BASE_URL}/channel-engagement", json=payload)
+        response = SESSION.post(f"{BASE_URL}/channel-engagement", data=PREPOPULATE_BODY, headers=JSON_HEADERS, timeout=TIMEOUT)
         if response.status_code == 200:
             print("  ✅ Pre-population successful.")
         else:
@@ -57,21 +76,15 @@ def prepopulate_channel_keyword_analysis():
     except Exception as e:
         print(f"  ❌ Pre-population error: {e}")
 
-def test_channel_strategy_analysis():
+def test_channel_strategy_analysis(channel_id=TEST_CHANNEL_ID):
     """Test the main channel strategy analysis endpoint"""
     print("\n🎯 Testing Channel Strategy Analysis...")
     
-    test_request = {
-        "channel_id": "UCKWaEZ-_VweaEx1j62do_vQ",
-        "region": "global",
-        "language": "en"
-    }
-    
     try:
-        response = requests.post(f"{BASE_URL}/analyze-channel-strategy", json=test_request)
+        response = SESSION.post(f"{BASE_URL}/analyze-channel-strategy", data=STRATEGY_BODIES[channel_id], headers=JSON_HEADERS, timeout=LLM_TIMEOUT)
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print("  ✅ Channel strategy analysis completed!")
             print(f"    📊 Channel ID: {result['channel_id']}")
             print(f"    🌍 Region: {result['region']}")
@@ -80,30 +93,26 @@ def test_channel_strategy_analysis():
             
             insights = result['strategic_insights']
             
-            # Display strategic insights
-            print(f"\n    📈 TRENDING TOPICS ({len(insights['trending_topics'])}):")
-            for i, topic in enumerate(insights['trending_topics'], 1):
-                print(f"      {i}. {topic}")
+            # Display strategic insights, collected and written in one go
+            lines = []
             
-            print(f"\n    🔍 KEYWORD GAPS ({len(insights['keyword_gaps'])}):")
-            for i, gap in enumerate(insights['keyword_gaps'], 1):
-                print(f"      {i}. {gap}")
+            def add_section(heading, items):
+                lines.append(f"\n    {heading} ({len(items)}):")
+                lines.extend(f"      {i}. {item}" for i, item in enumerate(items, 1))
             
-            print(f"\n    🎬 TITLE SUGGESTIONS ({len(insights['title_suggestions'])}):")
-            for i, title in enumerate(insights['title_suggestions'], 1):
-                print(f"      {i}. {title}")
+            add_section("📈 TRENDING TOPICS", insights['trending_topics'])
+            add_section("🔍 KEYWORD GAPS", insights['keyword_gaps'])
+            add_section("🎬 TITLE SUGGESTIONS", insights['title_suggestions'])
             
-            print(f"\n    🔗 KEYWORD CLUSTERS ({len(insights['keyword_clusters'])}):")
-            for cluster_name, keywords in insights['keyword_clusters'].items():
-                print(f"      📁 {cluster_name.upper()}: {', '.join(keywords[:3])}")
+            lines.append(f"\n    🔗 KEYWORD CLUSTERS ({len(insights['keyword_clusters'])}):")
+            lines.extend(
+                f"      📁 {cluster_name.upper()}: {', '.join(keywords[:3])}"
+                for cluster_name, keywords in insights['keyword_clusters'].items()
+            )
             
-            print(f"\n    ❓ VIEWER QUESTIONS ({len(insights['viewer_questions'])}):")
-            for i, question in enumerate(insights['viewer_questions'], 1):
-                print(f"      {i}. {question}")
-            
-            print(f"\n    🌍 REGIONAL KEYWORDS ({len(insights['regional_keywords'])}):")
-            for i, keyword in enumerate(insights['regional_keywords'], 1):
-                print(f"      {i}. {keyword}")
+            add_section("❓ VIEWER QUESTIONS", insights['viewer_questions'])
+            add_section("🌍 REGIONAL KEYWORDS", insights['regional_keywords'])
+            sys.stdout.write("\n".join(lines) + "\n")
             
             return True
         else:
@@ -115,17 +124,15 @@ def test_channel_strategy_analysis():
         print(f"  ❌ Analysis error: {e}")
         return False
 
-def test_database_retrieval():
+def test_database_retrieval(channel_id=TEST_CHANNEL_ID):
     """Test retrieving stored strategy analysis"""
     print("\n💾 Testing Database Retrieval...")
     
-    channel_id = "UCKWaEZ-_VweaEx1j62do_vQ"
-    
     try:
-        response = requests.get(f"{BASE_URL}/channel-engagement/{channel_id}/channel_strategy")
+        response = SESSION.get(f"{BASE_URL}/channel-engagement/{channel_id}/channel_strategy", timeout=TIMEOUT)
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             if result['found']:
                 data = result['data']
                 print("  ✅ Stored strategy analysis found")
@@ -156,8 +163,13 @@ def main():
     print("🧪 Channel Strategy Analysis - Test Suite")
     print("=" * 60)
     
-    # Check if API is available
-    ai_enabled = test_health_check()
+    # Check if API is available; pre-population only needs the database,
+    # so it runs alongside the health check
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        health_future = executor.submit(test_health_check)
+        prepopulate_future = executor.submit(prepopulate_channel_keyword_analysis)
+        ai_enabled = health_future.result()
+        prepopulate_future.result()
     
     if not ai_enabled:
         print("\n❌ AI features are not available. Please ensure:")
@@ -166,14 +178,16 @@ def main():
         print("  • All dependencies are installed")
         return
     
-    prepopulate_channel_keyword_analysis()
     print("\n🚀 All systems ready! Running strategic analysis tests...")
     
-    # Run tests
-    success = test_channel_strategy_analysis()
+    # Run tests; analyses for different channels are independent, so they
+    # go out together and each channel's stored result is checked after
+    with ThreadPoolExecutor(max_workers=len(CHANNEL_IDS)) as executor:
+        results = list(executor.map(test_channel_strategy_analysis, CHANNEL_IDS))
     
-    if success:
-        test_database_retrieval()
+    for channel_id, success in zip(CHANNEL_IDS, results):
+        if success:
+            test_database_retrieval(channel_id)
     
     print("\n" + "=" * 60)
     print("🎉 Channel strategy analysis testing completed!")
@@ -186,10 +200,11 @@ def main():
     print("  • Regional keyword optimization")
 
 if __name__ == "__main__":
-    try:
-        main()
-    except requests.exceptions.ConnectionError:
-        print("❌ Connection Error: Make sure the API server is running!")
-        print("💡 Start the server with: python main.py")
-    except Exception as e:
-        print(f"❌ Test Error: {e}") 
\ No newline at end of file
+    with SESSION:
+        try:
+            main()
+        except requests.exceptions.ConnectionError:
+            print("❌ Connection Error: Make sure the API server is running!")
+            print("💡 Start the server with: python main.py")
+        except Exception as e:
+            print(f"❌ Test Error: {e}") 
\ No newline at end of file
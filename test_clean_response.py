@@ -4,73 +4,62 @@ Test script to verify that the API returns clean responses
 """
 
 import requests
-import json
+import orjson
 import time
+from _http import JSON_HEADERS, LLM_TIMEOUT, SESSION
 
 BASE_URL = "http://localhost:8000"
 
+# Test data, encoded once
+TEST_REQUEST_BODY = orjson.dumps({
+    "channel_id": "UCx8Thl4BbkOwslTGXzPJx0A",
+    "region": "global",
+    "language": "en"
+})
+
+# List-valued strategic insights checked for leaked key names
+LIST_KEYS = ("trending_topics", "keyword_gaps", "title_suggestions", "viewer_questions", "regional_keywords")
+
+def wait_for_server(timeout: float = 10.0) -> bool:
+    """Poll /health with exponential backoff until the server answers or the timeout passes"""
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        try:
+            if SESSION.get(f"{BASE_URL}/health", timeout=1).status_code == 200:
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+        delay = min(delay * 2, 1.0)
+    return False
+
 def test_clean_response():
     """Test that the API returns clean responses without key names in list items"""
     
     print("🧪 Testing API response cleaning...")
     print("=" * 50)
     
-    # Test data
-    test_request = {
-        "channel_id": "UCx8Thl4BbkOwslTGXzPJx0A",
-        "region": "global",
-        "language": "en"
-    }
-    
     try:
         print("📡 Making API request...")
-        response = requests.post(f"{BASE_URL}/analyze-channel-strategy", json=test_request)
+        response = SESSION.post(f"{BASE_URL}/analyze-channel-strategy", data=TEST_REQUEST_BODY, headers=JSON_HEADERS, timeout=LLM_TIMEOUT)
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print("✅ API request successful!")
             
-            # Check for key names in list items
-            issues_found = []
-            
             strategic_insights = result.get('strategic_insights', {})
             
-            # Check trending_topics
-            if 'trending_topics' in strategic_insights:
-                topics = strategic_insights['trending_topics']
-                if topics and topics[0] == 'trending_topics':
-                    issues_found.append("trending_topics contains key name as first item")
-            
-            # Check keyword_gaps
-            if 'keyword_gaps' in strategic_insights:
-                gaps = strategic_insights['keyword_gaps']
-                if gaps and gaps[0] == 'keyword_gaps':
-                    issues_found.append("keyword_gaps contains key name as first item")
-            
-            # Check title_suggestions
-            if 'title_suggestions' in strategic_insights:
-                titles = strategic_insights['title_suggestions']
-                if titles and titles[0] == 'title_suggestions':
-                    issues_found.append("title_suggestions contains key name as first item")
-            
-            # Check viewer_questions
-            if 'viewer_questions' in strategic_insights:
-                questions = strategic_insights['viewer_questions']
-                if questions and questions[0] == 'viewer_questions':
-                    issues_found.append("viewer_questions contains key name as first item")
-            
-            # Check regional_keywords
-            if 'regional_keywords' in strategic_insights:
-                regional = strategic_insights['regional_keywords']
-                if regional and regional[0] == 'regional_keywords':
-                    issues_found.append("regional_keywords contains key name as first item")
+            # A cleaned list never starts with its own key name
+            issues_found = [f"{key} contains key name as first item" for key in LIST_KEYS
+                            if strategic_insights.get(key) and strategic_insights[key][0] == key]
             
             if issues_found:
                 print("❌ Issues found:")
                 for issue in issues_found:
                     print(f"  - {issue}")
                 print("\n📝 Full response:")
-                print(json.dumps(result, indent=2))
+                print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
                 return False
             else:
                 print("✅ No key names found in list items!")
@@ -97,15 +86,17 @@ def test_clean_response():
         return False
 
 if __name__ == "__main__":
-    print("🚀 Testing API response cleaning...")
-    
-    # Wait a moment for server to start
-    print("⏳ Waiting for server to be ready...")
-    time.sleep(3)
-    
-    success = test_clean_response()
-    
-    if success:
-        print("\n✅ Test passed! The API now returns clean responses.")
-    else:
-        print("\n❌ Test failed. The API still has issues.") 
\ No newline at end of file
+    with SESSION:
+        print("🚀 Testing API response cleaning...")
+        
+        # Wait for the server to start, returning as soon as it's up
+        print("⏳ Waiting for server to be ready...")
+        if not wait_for_server():
+            print("⚠️  Server did not report healthy within 10s, trying anyway")
+        
+        success = test_clean_response()
+        
+        if success:
+            print("\n✅ Test passed! The API now returns clean responses.")
+        else:
+            print("\n❌ Test failed. The API still has issues.") 
\ No newline at end of file
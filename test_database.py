@@ -1,9 +1,29 @@
 import requests
 import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from _http import LLM_TIMEOUT, SESSION, TIMEOUT, get_health
 
 # Test data for database operations
 BASE_URL = "http://localhost:8000"
 
+def save_engagement(channel_id, engagement_type, data):
+    """POST one engagement dataset"""
+    payload = {
+        "channel_id": channel_id,
+        "engagement_type": engagement_type,
+        "data": data
+    }
+    return SESSION.post(f"{BASE_URL}/channel-engagement", json=payload, timeout=TIMEOUT)
+
+def get_engagement(channel_id, engagement_type):
+    """GET one stored engagement dataset"""
+    return SESSION.get(f"{BASE_URL}/channel-engagement/{channel_id}/{engagement_type}", timeout=TIMEOUT)
+
+def save_and_verify(channel_id, engagement_type, data):
+    """Save one engagement dataset and read it straight back"""
+    return save_engagement(channel_id, engagement_type, data), get_engagement(channel_id, engagement_type)
+
 def test_database_operations():
     """Test all database-related endpoints"""
     
@@ -36,19 +56,22 @@ def test_database_operations():
         }
     }
     
+    # The engagement types are independent, so each one is saved and read
+    # back on its own worker; a type's GET goes out as soon as its POST
+    # returns. Tests 1 and 2 then report the responses in order
+    # Engagement types and datasets are taken from the dict once, in a fixed
+    # order that the reports below zip against
+    engagement_types = list(test_data)
+    datasets = list(test_data.values())
+    channel_ids = [channel_id] * len(engagement_types)
+    with ThreadPoolExecutor(max_workers=len(engagement_types)) as executor:
+        round_trips = list(executor.map(save_and_verify, channel_ids, engagement_types, datasets))
+    
     # Test 1: Save engagement data
     print("📤 Test 1: Saving channel engagement data...")
-    for engagement_type, data in test_data.items():
-        payload = {
-            "channel_id": channel_id,
-            "engagement_type": engagement_type,
-            "data": data
-        }
-        
-        response = requests.post(f"{BASE_URL}/channel-engagement", json=payload)
-        
+    for engagement_type, (response, _) in zip(engagement_types, round_trips):
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print(f"  ✅ Saved {engagement_type}: {result['message']}")
         else:
             print(f"  ❌ Failed to save {engagement_type}: {response.text}")
@@ -57,11 +80,9 @@ def test_database_operations():
     
     # Test 2: Retrieve specific engagement data
     print("📥 Test 2: Retrieving specific engagement data...")
-    for engagement_type in test_data.keys():
-        response = requests.get(f"{BASE_URL}/channel-engagement/{channel_id}/{engagement_type}")
-        
+    for engagement_type, (_, response) in zip(engagement_types, round_trips):
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             if result['found']:
                 print(f"  ✅ Retrieved {engagement_type}: {len(str(result['data']))} characters")
             else:
@@ -73,10 +94,10 @@ def test_database_operations():
     
     # Test 3: Get all engagement data for channel
     print("📊 Test 3: Getting all engagement data for channel...")
-    response = requests.get(f"{BASE_URL}/channel-engagement/{channel_id}")
+    response = SESSION.get(f"{BASE_URL}/channel-engagement/{channel_id}", timeout=TIMEOUT)
     
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"  ✅ Retrieved {result['total_engagement_types']} engagement types")
         for eng_type in result['engagement_data'].keys():
             print(f"    - {eng_type}")
@@ -100,19 +121,19 @@ def test_database_operations():
         "channel_id": channel_id  # This will trigger database storage
     }
     
-    response = requests.post(f"{BASE_URL}/analyze-keywords", json=analysis_payload)
+    response = SESSION.post(f"{BASE_URL}/analyze-keywords", json=analysis_payload, timeout=LLM_TIMEOUT)
     
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"  ✅ Keyword analysis completed")
         print(f"    - Top keywords: {len(result['top_keywords'])}")
         print(f"    - Categories: {len(result['keyword_categories'])}")
         print(f"    - Recommendations: {len(result['recommendations'])}")
         
         # Check if analysis was saved to database
-        response = requests.get(f"{BASE_URL}/channel-engagement/{channel_id}/keyword_analysis")
+        response = SESSION.get(f"{BASE_URL}/channel-engagement/{channel_id}/keyword_analysis", timeout=TIMEOUT)
         if response.status_code == 200:
-            db_result = response.json()
+            db_result = orjson.loads(response.content)
             if db_result['found']:
                 print(f"  ✅ Analysis results saved to database")
             else:
@@ -124,10 +145,10 @@ def test_database_operations():
     
     # Test 5: Test non-existent data retrieval
     print("🔍 Test 5: Testing retrieval of non-existent data...")
-    response = requests.get(f"{BASE_URL}/channel-engagement/nonexistent_channel/nonexistent_type")
+    response = SESSION.get(f"{BASE_URL}/channel-engagement/nonexistent_channel/nonexistent_type", timeout=TIMEOUT)
     
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         if not result['found']:
             print(f"  ✅ Correctly handled non-existent data")
         else:
@@ -138,10 +159,10 @@ def test_database_operations():
 def test_health_with_database():
     """Test health check with database status"""
     print("🏥 Testing Health Check with Database...")
-    response = requests.get(f"{BASE_URL}/health")
+    response = get_health()
     
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"  ✅ API Status: {result['status']}")
         print(f"  🗄️  Database Status: {result['database_status']}")
         print(f"  📁 Database Path: {result['database_path']}")
@@ -5,9 +5,11 @@ Test script to verify environment-based configuration is working
 
 import requests
 import json
+import orjson
 import time
 import sys
 from config import settings
+from _http import SESSION, TIMEOUT
 
 def test_configuration():
     """Test the configuration loading"""
@@ -63,10 +65,10 @@ def test_health_endpoint():
         print(f"🌐 Testing endpoint: {base_url}/health")
         
         # Note: This will fail if server isn't running, but that's expected
-        response = requests.get(f"{base_url}/health", timeout=5)
+        response = SESSION.get(f"{base_url}/health", timeout=TIMEOUT)
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print("✅ Health endpoint accessible!")
             
             # Check if configuration is included in response
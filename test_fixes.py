@@ -4,6 +4,16 @@ Test script to verify the JSON cleaning fixes
 """
 
 import json
+import orjson
+
+def clean_response_data(data):
+    """Clean response data to remove key names from list items"""
+    # Same algorithm as AsyncLLMService._clean_response_data in main.py:
+    # every item equal to its list's key is dropped, wherever it appears
+    return {
+        key: [item for item in value if item != key] if isinstance(value, list) and value else value
+        for key, value in data.items()
+    }
 
 def test_json_cleaning():
     """Test the JSON cleaning functionality"""
@@ -19,33 +29,19 @@ def test_json_cleaning():
     }
     
     print("🧪 Testing JSON cleaning functionality...")
-    print(f"📝 Original data: {json.dumps(test_data, indent=2)}")
-    
-    # Simulate the cleaning function
-    def clean_response_data(data):
-        """Clean response data to remove key names from list items"""
-        cleaned_data = {}
-        for key, value in data.items():
-            if isinstance(value, list) and len(value) > 0:
-                # Remove any list items that are just the key name
-                cleaned_list = [item for item in value if item != key]
-                cleaned_data[key] = cleaned_list
-            else:
-                cleaned_data[key] = value
-        return cleaned_data
+    print(f"📝 Original data: {orjson.dumps(test_data, option=orjson.OPT_INDENT_2).decode()}")
     
     # Clean the data
     cleaned_data = clean_response_data(test_data)
     
-    print(f"✅ Cleaned data: {json.dumps(cleaned_data, indent=2)}")
+    print(f"✅ Cleaned data: {orjson.dumps(cleaned_data, option=orjson.OPT_INDENT_2).decode()}")
     
     # Verify the cleaning worked
     issues_found = []
     
     for key, value in cleaned_data.items():
-        if isinstance(value, list) and len(value) > 0:
-            if value[0] == key:
-                issues_found.append(f"Key '{key}' still appears as first item in list")
+        if isinstance(value, list) and key in value:
+            issues_found.append(f"Key '{key}' still appears as an item in its list")
     
     if issues_found:
         print("❌ Issues found:")
@@ -80,21 +76,11 @@ def test_json_parsing():
         print(f"✅ Parsed JSON: {parsed_json}")
         
         # Clean the data
-        def clean_response_data(data):
-            cleaned_data = {}
-            for key, value in data.items():
-                if isinstance(value, list) and len(value) > 0:
-                    cleaned_list = [item for item in value if item != key]
-                    cleaned_data[key] = cleaned_list
-                else:
-                    cleaned_data[key] = value
-            return cleaned_data
-        
         cleaned_json = clean_response_data(parsed_json)
         print(f"🧹 Cleaned JSON: {cleaned_json}")
         
         # Verify the result
-        if cleaned_json["trending_topics"][0] != "trending_topics":
+        if "trending_topics" not in cleaned_json["trending_topics"]:
             print("✅ Successfully removed key name from list!")
             return True
         else:
@@ -1,14 +1,15 @@
 #!/usr/bin/env python3
 """Simple health check test"""
 
-import requests
 import json
+import orjson
+from _http import get_health
 
 try:
-    response = requests.get('http://localhost:8000/health')
+    response = get_health()
     if response.status_code == 200:
         print("✅ Health check successful!")
-        data = response.json()
+        data = orjson.loads(response.content)
         print(f"📊 Status: {data.get('status')}")
         print(f"🗄️  Database: {data.get('database_status')}")
         print(f"🤖 Ollama: {data.get('ollama_model_status')}")
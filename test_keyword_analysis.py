@@ -5,8 +5,17 @@ Tests the new endpoint that accepts keywords as direct input
 
 import requests
 import json
+import sys
+import orjson
+from _http import JSON_HEADERS, LLM_TIMEOUT, SESSION
 
 BASE_URL = "http://localhost:8000"
+URL_ANALYZE = f"{BASE_URL}/analyze-keywords"
+URL_ANALYZE_BATCH = f"{BASE_URL}/analyze-keywords-batch"
+
+def _numbered(items, indent="      "):
+    """Report lines listing items as 1., 2., ..."""
+    return [f"{indent}{i}. {item}" for i, item in enumerate(items, 1)]
 
 def test_keyword_analysis():
     """Test the new keyword analysis endpoint"""
@@ -29,43 +38,42 @@ def test_keyword_analysis():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/analyze-keywords", json=test_request)
+        response = SESSION.post(URL_ANALYZE, data=orjson.dumps(test_request), headers=JSON_HEADERS, timeout=LLM_TIMEOUT)
         
         if response.status_code == 200:
-            result = response.json()
-            print("  ✅ Keyword analysis completed!")
-            print(f"    📊 Channel ID: {result['channel_id']}")
-            print(f"    🌍 Region: {result['region']}")
-            print(f"    🗣️  Language: {result['language']}")
-            print(f"    📅 Analysis Time: {result['analysis_timestamp']}")
+            result = orjson.loads(response.content)
+            
+            # The report is buffered and written once instead of line by line
+            lines = []
+            lines.append("  ✅ Keyword analysis completed!")
+            lines.append(f"    📊 Channel ID: {result['channel_id']}")
+            lines.append(f"    🌍 Region: {result['region']}")
+            lines.append(f"    🗣️  Language: {result['language']}")
+            lines.append(f"    📅 Analysis Time: {result['analysis_timestamp']}")
             
             insights = result['strategic_insights']
             
             # Display strategic insights
-            print(f"\n    📈 TRENDING TOPICS ({len(insights['trending_topics'])}):")
-            for i, topic in enumerate(insights['trending_topics'], 1):
-                print(f"      {i}. {topic}")
+            lines.append(f"\n    📈 TRENDING TOPICS ({len(insights['trending_topics'])}):")
+            lines.extend(_numbered(insights['trending_topics']))
             
-            print(f"\n    🔍 KEYWORD GAPS ({len(insights['keyword_gaps'])}):")
-            for i, gap in enumerate(insights['keyword_gaps'], 1):
-                print(f"      {i}. {gap}")
+            lines.append(f"\n    🔍 KEYWORD GAPS ({len(insights['keyword_gaps'])}):")
+            lines.extend(_numbered(insights['keyword_gaps']))
             
-            print(f"\n    🎬 TITLE SUGGESTIONS ({len(insights['title_suggestions'])}):")
-            for i, title in enumerate(insights['title_suggestions'], 1):
-                print(f"      {i}. {title}")
+            lines.append(f"\n    🎬 TITLE SUGGESTIONS ({len(insights['title_suggestions'])}):")
+            lines.extend(_numbered(insights['title_suggestions']))
             
-            print(f"\n    🔗 KEYWORD CLUSTERS ({len(insights['keyword_clusters'])}):")
+            lines.append(f"\n    🔗 KEYWORD CLUSTERS ({len(insights['keyword_clusters'])}):")
             for cluster_name, keywords in insights['keyword_clusters'].items():
-                print(f"      📁 {cluster_name.upper()}: {', '.join(keywords[:3])}")
+                lines.append(f"      📁 {cluster_name.upper()}: {', '.join(keywords[:3])}")
             
-            print(f"\n    ❓ VIEWER QUESTIONS ({len(insights['viewer_questions'])}):")
-            for i, question in enumerate(insights['viewer_questions'], 1):
-                print(f"      {i}. {question}")
+            lines.append(f"\n    ❓ VIEWER QUESTIONS ({len(insights['viewer_questions'])}):")
+            lines.extend(_numbered(insights['viewer_questions']))
             
-            print(f"\n    🌍 REGIONAL KEYWORDS ({len(insights['regional_keywords'])}):")
-            for i, keyword in enumerate(insights['regional_keywords'], 1):
-                print(f"      {i}. {keyword}")
+            lines.append(f"\n    🌍 REGIONAL KEYWORDS ({len(insights['regional_keywords'])}):")
+            lines.extend(_numbered(insights['regional_keywords']))
             
+            sys.stdout.write("\n".join(lines) + "\n")
             return True
         else:
             print(f"  ❌ Analysis failed: {response.status_code}")
@@ -95,38 +103,43 @@ def test_different_keywords():
         }
     ]
     
-    for test_case in test_cases:
-        print(f"\n  🔍 Testing: {test_case['name']}")
-        
-        test_request = {
-            "channel_id": "UCKWaEZ-_VweaEx1j62do_vQ",
-            "keywords": test_case["keywords"],
-            "region": "global",
-            "language": "en"
-        }
+    # All keyword sets go to the server in one batched request
+    body = orjson.dumps({
+        "channel_id": "UCKWaEZ-_VweaEx1j62do_vQ",
+        "batches": [
+            {"keywords": test_case["keywords"], "region": "global", "language": "en"}
+            for test_case in test_cases
+        ]
+    })
+    
+    try:
+        response = SESSION.post(URL_ANALYZE_BATCH, data=body, headers=JSON_HEADERS, timeout=LLM_TIMEOUT)
         
-        try:
-            response = requests.post(f"{BASE_URL}/analyze-keywords", json=test_request)
+        if response.status_code == 200:
+            for test_case, result in zip(test_cases, orjson.loads(response.content)['results']):
+                print("\n".join(_keyword_case_report(test_case, result)))
+        else:
+            print(f"    ❌ Failed: {response.status_code}")
             
-            if response.status_code == 200:
-                result = response.json()
-                insights = result['strategic_insights']
-                
-                print(f"    ✅ Success! Generated {len(insights['title_suggestions'])} title suggestions")
-                print(f"    📈 Found {len(insights['trending_topics'])} trending topics")
-                print(f"    🔍 Identified {len(insights['keyword_gaps'])} keyword gaps")
-                
-                # Show first few results
-                if insights['title_suggestions']:
-                    print(f"    🎬 Sample title: {insights['title_suggestions'][0]}")
-                if insights['trending_topics']:
-                    print(f"    📈 Sample trend: {insights['trending_topics'][0]}")
-                    
-            else:
-                print(f"    ❌ Failed: {response.status_code}")
-                
-        except Exception as e:
-            print(f"    ❌ Error: {e}")
+    except Exception as e:
+        print(f"    ❌ Error: {e}")
+
+def _keyword_case_report(test_case, result):
+    """Report lines for one keyword set's analysis"""
+    insights = result['strategic_insights']
+    
+    lines = [f"\n  🔍 Testing: {test_case['name']}"]
+    lines.append(f"    ✅ Success! Generated {len(insights['title_suggestions'])} title suggestions")
+    lines.append(f"    📈 Found {len(insights['trending_topics'])} trending topics")
+    lines.append(f"    🔍 Identified {len(insights['keyword_gaps'])} keyword gaps")
+    
+    # Show first few results
+    if insights['title_suggestions']:
+        lines.append(f"    🎬 Sample title: {insights['title_suggestions'][0]}")
+    if insights['trending_topics']:
+        lines.append(f"    📈 Sample trend: {insights['trending_topics'][0]}")
+    
+    return lines
 
 def main():
     """Run keyword analysis tests"""
@@ -149,10 +162,11 @@ def main():
     print("  • Generate content recommendations on-the-fly")
 
 if __name__ == "__main__":
-    try:
-        main()
-    except requests.exceptions.ConnectionError:
-        print("❌ Connection Error: Make sure the API server is running!")
-        print("💡 Start the server with: python main.py")
-    except Exception as e:
-        print(f"❌ Test Error: {e}") 
\ No newline at end of file
+    with SESSION:
+        try:
+            main()
+        except requests.exceptions.ConnectionError:
+            print("❌ Connection Error: Make sure the API server is running!")
+            print("💡 Start the server with: python main.py")
+        except Exception as e:
+            print(f"❌ Test Error: {e}") 
\ No newline at end of file
@@ -4,19 +4,46 @@ Tests GPT-2 text generation, keyword suggestions, and enhanced analysis
 """
 
 import requests
+import argparse
 import json
+import logging
+import sys
 import time
+import numpy as np
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from _http import JSON_HEADERS, LLM_TIMEOUT, SESSION, TIMEOUT, URL_HEALTH, get_health
 
 BASE_URL = "http://localhost:8000"
+URL_ANALYZE = f"{BASE_URL}/analyze-keywords"
+URL_GENERATE_TEXT = f"{BASE_URL}/generate-text"
+URL_KEYWORD_SUGGESTIONS = f"{BASE_URL}/generate-keyword-suggestions"
+URL_VIDEO_DESCRIPTION = f"{BASE_URL}/generate-video-description"
+
+# Concurrency levels the performance test steps through, raised until
+# throughput flattens, and the requests sent per in-flight slot at each level
+PERF_CONCURRENCY_LEVELS = (1, 2, 4, 8)
+PERF_REQUESTS_PER_SLOT = 2
+
+# Per-request diagnostics, shown with --verbose
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
 
 def test_health_with_llm():
     """Test health check to verify LLM model status"""
     print("🏥 Testing Health Check with LLM Status...")
     
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        # The HEAD probe skips the server's database and Ollama checks, so
+        # a server that isn't up is caught before waiting on the full report
+        probe = SESSION.head(URL_HEALTH, timeout=TIMEOUT)
+        if probe.status_code != 200:
+            print(f"  ❌ Health check failed: {probe.status_code}")
+            return False
+        
+        response = get_health()
         if response.status_code == 200:
-            health = response.json()
+            health = orjson.loads(response.content)
             print(f"  ✅ API Status: {health['status']}")
             print(f"  🗄️  Database: {health['database_status']}")
             print(f"  🤖 GPT-2 Model: {health['gpt2_model_status']}")
@@ -35,7 +62,7 @@ def test_health_with_llm():
 
 def test_text_generation():
     """Test basic text generation endpoint"""
-    print("\n🤖 Test 1: Basic Text Generation...")
+    header = "\n🤖 Test 1: Basic Text Generation..."
     
     test_prompts = [
         {
@@ -52,27 +79,44 @@ def test_text_generation():
         }
     ]
     
-    for i, prompt_data in enumerate(test_prompts, 1):
-        try:
-            response = requests.post(f"{BASE_URL}/generate-text", json=prompt_data)
+    _print_concurrently(header, _run_text_generation, [orjson.dumps(prompt) for prompt in test_prompts])
+
+def _print_concurrently(header, run_case, cases):
+    """Run independent cases at once, then write the header and their report lines in case order"""
+    with ThreadPoolExecutor(max_workers=len(cases)) as executor:
+        reports = list(executor.map(run_case, range(1, len(cases) + 1), cases))
+    
+    # One write per test, so tests running side by side in main() don't
+    # interleave their output
+    lines = [header]
+    for report in reports:
+        lines.extend(report)
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def _run_text_generation(i, body):
+    """Generate text for one pre-serialized prompt request, returning its report lines"""
+    lines = []
+    try:
+        response = SESSION.post(URL_GENERATE_TEXT, data=body, headers=JSON_HEADERS, timeout=LLM_TIMEOUT)
+        
+        if response.status_code == 200:
+            result = orjson.loads(response.content)
+            lines.append(f"  ✅ Test {i} - Generated {len(result['generated_texts'])} text(s)")
+            lines.append(f"    📝 Original prompt: '{result['original_prompt'][:50]}...'")
+            lines.append(f"    🎯 Model used: {result['model_used']}")
             
-            if response.status_code == 200:
-                result = response.json()
-                print(f"  ✅ Test {i} - Generated {len(result['generated_texts'])} text(s)")
-                print(f"    📝 Original prompt: '{result['original_prompt'][:50]}...'")
-                print(f"    🎯 Model used: {result['model_used']}")
-                
-                for j, text in enumerate(result['generated_texts']):
-                    print(f"    📄 Text {j+1}: '{text[:100]}{'...' if len(text) > 100 else ''}'")
-            else:
-                print(f"  ❌ Test {i} failed: {response.status_code} - {response.text}")
-                
-        except Exception as e:
-            print(f"  ❌ Test {i} error: {e}")
+            for j, text in enumerate(result['generated_texts']):
+                lines.append(f"    📄 Text {j+1}: '{text[:100]}{'...' if len(text) > 100 else ''}'")
+        else:
+            lines.append(f"  ❌ Test {i} failed: {response.status_code} - {response.text}")
+            
+    except Exception as e:
+        lines.append(f"  ❌ Test {i} error: {e}")
+    return lines
 
 def test_keyword_suggestions():
     """Test AI-powered keyword suggestions"""
-    print("\n🎯 Test 2: AI Keyword Suggestions...")
+    header = "\n🎯 Test 2: AI Keyword Suggestions..."
     
     test_requests = [
         {
@@ -92,32 +136,37 @@ def test_keyword_suggestions():
         }
     ]
     
-    for i, request_data in enumerate(test_requests, 1):
-        try:
-            response = requests.post(f"{BASE_URL}/generate-keyword-suggestions", json=request_data)
+    _print_concurrently(header, _run_keyword_suggestions, [orjson.dumps(request) for request in test_requests])
+
+def _run_keyword_suggestions(i, body):
+    """Request keyword suggestions for one pre-serialized topic request, returning its report lines"""
+    lines = []
+    try:
+        response = SESSION.post(URL_KEYWORD_SUGGESTIONS, data=body, headers=JSON_HEADERS, timeout=LLM_TIMEOUT)
+        
+        if response.status_code == 200:
+            result = orjson.loads(response.content)
+            lines.append(f"  ✅ Test {i} - Topic: {result['topic']}")
+            lines.append(f"    👥 Audience: {result['target_audience']}")
+            lines.append(f"    📺 Type: {result['content_type']}")
+            lines.append(f"    🔑 Keywords generated: {len(result['keywords'])}")
+            lines.append(f"    💡 Content ideas: {len(result['content_ideas'])}")
             
-            if response.status_code == 200:
-                result = response.json()
-                print(f"  ✅ Test {i} - Topic: {result['topic']}")
-                print(f"    👥 Audience: {result['target_audience']}")
-                print(f"    📺 Type: {result['content_type']}")
-                print(f"    🔑 Keywords generated: {len(result['keywords'])}")
-                print(f"    💡 Content ideas: {len(result['content_ideas'])}")
-                
-                if result['keywords']:
-                    print(f"    📋 Sample keywords: {', '.join(result['keywords'][:3])}")
-                if result['content_ideas']:
-                    print(f"    💭 Sample ideas: {result['content_ideas'][0][:60]}...")
-                    
-            else:
-                print(f"  ❌ Test {i} failed: {response.status_code} - {response.text}")
+            if result['keywords']:
+                lines.append(f"    📋 Sample keywords: {', '.join(result['keywords'][:3])}")
+            if result['content_ideas']:
+                lines.append(f"    💭 Sample ideas: {result['content_ideas'][0][:60]}...")
                 
-        except Exception as e:
-            print(f"  ❌ Test {i} error: {e}")
+        else:
+            lines.append(f"  ❌ Test {i} failed: {response.status_code} - {response.text}")
+            
+    except Exception as e:
+        lines.append(f"  ❌ Test {i} error: {e}")
+    return lines
 
 def test_video_description_generation():
     """Test video description generation"""
-    print("\n📝 Test 3: Video Description Generation...")
+    header = "\n📝 Test 3: Video Description Generation..."
     
     test_cases = [
         {
@@ -132,29 +181,34 @@ def test_video_description_generation():
         }
     ]
     
-    for i, case in enumerate(test_cases, 1):
-        try:
-            # Use query parameters for this endpoint
-            params = {
-                "title": case["title"],
-                "keywords": case["keywords"],
-                "target_length": case["target_length"]
-            }
-            
-            response = requests.post(f"{BASE_URL}/generate-video-description", params=params)
-            
-            if response.status_code == 200:
-                result = response.json()
-                print(f"  ✅ Test {i} - Title: '{result['title']}'")
-                print(f"    📏 Description length: {result['description_length']} chars")
-                print(f"    🔑 Keywords used: {', '.join(result['keywords_used'])}")
-                print(f"    📄 Description: '{result['generated_description'][:80]}...'")
-                    
-            else:
-                print(f"  ❌ Test {i} failed: {response.status_code} - {response.text}")
+    _print_concurrently(header, _run_video_description, test_cases)
+
+def _run_video_description(i, case):
+    """Generate one video description, returning its report lines"""
+    lines = []
+    try:
+        # Use query parameters for this endpoint
+        params = {
+            "title": case["title"],
+            "keywords": case["keywords"],
+            "target_length": case["target_length"]
+        }
+        
+        response = SESSION.post(URL_VIDEO_DESCRIPTION, params=params, timeout=LLM_TIMEOUT)
+        
+        if response.status_code == 200:
+            result = orjson.loads(response.content)
+            lines.append(f"  ✅ Test {i} - Title: '{result['title']}'")
+            lines.append(f"    📏 Description length: {result['description_length']} chars")
+            lines.append(f"    🔑 Keywords used: {', '.join(result['keywords_used'])}")
+            lines.append(f"    📄 Description: '{result['generated_description'][:80]}...'")
                 
-        except Exception as e:
-            print(f"  ❌ Test {i} error: {e}")
+        else:
+            lines.append(f"  ❌ Test {i} failed: {response.status_code} - {response.text}")
+            
+    except Exception as e:
+        lines.append(f"  ❌ Test {i} error: {e}")
+    return lines
 
 def test_enhanced_keyword_analysis():
     """Test enhanced keyword analysis with AI suggestions"""
@@ -178,33 +232,38 @@ def test_enhanced_keyword_analysis():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/analyze-keywords", json=channel_data)
+        response = SESSION.post(URL_ANALYZE, data=orjson.dumps(channel_data), headers=JSON_HEADERS, timeout=LLM_TIMEOUT)
         
         if response.status_code == 200:
-            result = response.json()
-            print("  ✅ Enhanced keyword analysis completed!")
-            print(f"    📊 Videos analyzed: {result['total_videos_analyzed']}")
-            print(f"    🔥 Top keywords found: {len(result['top_keywords'])}")
-            print(f"    📂 Categories: {len(result['keyword_categories'])}")
-            print(f"    💡 Recommendations: {len(result['recommendations'])}")
+            result = orjson.loads(response.content)
+            
+            # The report is buffered and written once instead of line by line
+            lines = []
+            lines.append("  ✅ Enhanced keyword analysis completed!")
+            lines.append(f"    📊 Videos analyzed: {result['total_videos_analyzed']}")
+            lines.append(f"    🔥 Top keywords found: {len(result['top_keywords'])}")
+            lines.append(f"    📂 Categories: {len(result['keyword_categories'])}")
+            lines.append(f"    💡 Recommendations: {len(result['recommendations'])}")
             
             # Check AI-generated features
             if result.get('ai_generated_suggestions'):
-                print(f"    🤖 AI keyword suggestions: {len(result['ai_generated_suggestions'])}")
-                print(f"       Sample: {', '.join(result['ai_generated_suggestions'][:3])}")
+                lines.append(f"    🤖 AI keyword suggestions: {len(result['ai_generated_suggestions'])}")
+                lines.append(f"       Sample: {', '.join(result['ai_generated_suggestions'][:3])}")
             else:
-                print("    ⚠️  No AI keyword suggestions generated")
+                lines.append("    ⚠️  No AI keyword suggestions generated")
                 
             if result.get('content_ideas'):
-                print(f"    💭 AI content ideas: {len(result['content_ideas'])}")
-                print(f"       Sample: {result['content_ideas'][0][:60]}..." if result['content_ideas'] else "")
+                lines.append(f"    💭 AI content ideas: {len(result['content_ideas'])}")
+                lines.append(f"       Sample: {result['content_ideas'][0][:60]}..." if result['content_ideas'] else "")
             else:
-                print("    ⚠️  No AI content ideas generated")
+                lines.append("    ⚠️  No AI content ideas generated")
                 
-                         # Display top keywords
-             print("    🔥 Top 3 keywords:")
-             for i, kw in enumerate(result['top_keywords'][:3], 1):
-                 print(f"       {i}. {kw.keyword} ({kw.frequency} times)")
+            # Display top keywords
+            lines.append("    🔥 Top 3 keywords:")
+            for i, kw in enumerate(result['top_keywords'][:3], 1):
+                lines.append(f"       {i}. {kw['keyword']} ({kw['frequency']} times)")
+                
+            sys.stdout.write("\n".join(lines) + "\n")
                 
         else:
             print(f"  ❌ Enhanced analysis failed: {response.status_code} - {response.text}")
@@ -220,10 +279,10 @@ def test_database_integration_with_ai():
     
     try:
         # Retrieve the AI-enhanced analysis from database
-        response = requests.get(f"{BASE_URL}/channel-engagement/{channel_id}/keyword_analysis")
+        response = SESSION.get(f"{BASE_URL}/channel-engagement/{channel_id}/keyword_analysis", timeout=TIMEOUT)
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             if result['found']:
                 data = result['data']
                 print("  ✅ Retrieved AI-enhanced analysis from database")
@@ -247,38 +306,83 @@ def performance_test():
     """Test performance of LLM operations"""
     print("\n⚡ Test 6: Performance Testing...")
     
+    # Timings below are warm: model loading happens during the warmup
+    print("  🔥 Warming up the LLM endpoints (not timed)...")
+    _warmup()
+    
     # Test response times for different operations
     operations = [
         {
             "name": "Quick text generation",
-            "url": f"{BASE_URL}/generate-text",
+            "url": URL_GENERATE_TEXT,
             "data": {"prompt": "YouTube tutorial about", "max_length": 50, "temperature": 0.7}
         },
         {
             "name": "Keyword suggestions",
-            "url": f"{BASE_URL}/generate-keyword-suggestions",
+            "url": URL_KEYWORD_SUGGESTIONS,
             "data": {"topic": "programming", "target_audience": "beginners", "content_type": "tutorial"}
         }
     ]
     
     for operation in operations:
-        try:
-            start_time = time.time()
-            response = requests.post(operation["url"], json=operation["data"])
-            end_time = time.time()
-            
-            duration = end_time - start_time
+        print(f"  📊 {operation['name']}:")
+        print(f"    {'conc':>4} {'reqs':>5} {'ok':>4} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} {'req/s':>7}")
+        for concurrency in PERF_CONCURRENCY_LEVELS:
+            n = concurrency * PERF_REQUESTS_PER_SLOT
+            latencies, failures, elapsed = _bench(operation["url"], operation["data"], n, concurrency)
             
-            if response.status_code == 200:
-                print(f"  ✅ {operation['name']}: {duration:.2f} seconds")
+            if latencies:
+                p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+                print(f"    {concurrency:>4} {n:>5} {len(latencies):>4} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {len(latencies) / elapsed:>7.2f}")
             else:
-                print(f"  ❌ {operation['name']}: Failed ({response.status_code})")
-                
+                print(f"    {concurrency:>4} {n:>5} {0:>4}  ❌ all requests failed ({failures[0]})")
+            for failure in failures:
+                logger.info("         ⚠️  %s", failure)
+
+def _warmup():
+    """Send one throwaway request per benchmarked endpoint so the model is loaded before timing"""
+    # Prompts differ from the benchmarked ones, so no timed request is a response cache hit
+    warmups = [
+        (URL_GENERATE_TEXT, {"prompt": "warmup", "max_length": 10, "temperature": 0.7}),
+        (URL_KEYWORD_SUGGESTIONS, {"topic": "warmup", "target_audience": "beginners", "content_type": "tutorial"}),
+    ]
+    for url, data in warmups:
+        try:
+            SESSION.post(url, data=orjson.dumps(data), headers=JSON_HEADERS, timeout=LLM_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            # A server that isn't answering shows up in the timed runs
+            logger.info("  ⚠️  Warmup request to %s failed: %s", url, e)
+
+def _bench(url, data, n, concurrency):
+    """Send n requests with at most `concurrency` in flight; return successful latencies, failures and wall time"""
+    body = orjson.dumps(data)
+    
+    def timed_post(_):
+        start = time.perf_counter()
+        try:
+            response = SESSION.post(url, data=body, headers=JSON_HEADERS, timeout=LLM_TIMEOUT)
+            failure = None if response.status_code == 200 else f"status {response.status_code}"
         except Exception as e:
-            print(f"  ❌ {operation['name']}: Error - {e}")
+            failure = str(e)
+        return time.perf_counter() - start, failure
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_post, range(n)))
+    elapsed = time.perf_counter() - start
+    
+    latencies = [latency for latency, failure in results if failure is None]
+    failures = [failure for _, failure in results if failure is not None]
+    return latencies, failures, elapsed
 
-def main():
+def main(argv=None):
     """Run all LLM feature tests"""
+    parser = argparse.ArgumentParser(description="LLM features test suite")
+    parser.add_argument("--verbose", action="store_true", help="show each failed request in the performance test")
+    args = parser.parse_args(argv)
+    logging.basicConfig(format="%(message)s")
+    logger.setLevel(logging.INFO if args.verbose else logging.WARNING)
+    
     print("🧪 Keyword Intelligence Assistant - LLM Features Test Suite")
     print("=" * 70)
     
@@ -292,10 +396,16 @@ def main():
     
     print("\n🚀 AI features are available! Running comprehensive tests...")
     
-    # Run all tests
-    test_text_generation()
-    test_keyword_suggestions()
-    test_video_description_generation()
+    # Run all tests. The generation tests are independent of each other and
+    # write their reports in one go, so they run side by side
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(test_text_generation),
+            executor.submit(test_keyword_suggestions),
+            executor.submit(test_video_description_generation),
+        ]
+        for future in futures:
+            future.result()
     test_enhanced_keyword_analysis()
     test_database_integration_with_ai()
     performance_test()
@@ -309,10 +419,11 @@ def main():
     print("  • Monitor performance with larger datasets")
 
 if __name__ == "__main__":
-    try:
-        main()
-    except requests.exceptions.ConnectionError:
-        print("❌ Connection Error: Make sure the API server is running!")
-        print("💡 Start the server with: python main.py")
-    except Exception as e:
-        print(f"❌ Test Error: {e}") 
\ No newline at end of file
+    with SESSION:
+        try:
+            main()
+        except requests.exceptions.ConnectionError:
+            print("❌ Connection Error: Make sure the API server is running!")
+            print("💡 Start the server with: python main.py")
+        except Exception as e:
+            print(f"❌ Test Error: {e}") 
\ No newline at end of file